@@ -5,7 +5,9 @@ PBM Contract Analyzer — FastAPI Backend
 import asyncio
 import json
 import os
-import uuid
+import secrets
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from typing import Optional
 
@@ -13,7 +15,8 @@ import anthropic as _anthropic
 from dotenv import load_dotenv
 from fastapi import Depends, FastAPI, File, HTTPException, Query, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, Response, StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, ORJSONResponse, Response, StreamingResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel
 
@@ -41,19 +44,21 @@ from services.knowledge import (
     update_knowledge_base,
 )
 from services.leads import (
+    checkpoint_db,
     count_leads,
-    export_leads_csv,
+    export_leads_csv_iter,
     get_broker_profile,
     get_contract_by_session,
     get_contract_list,
     get_library_benchmarks,
     scrub_key_concerns,
     init_db,
+    optimize_db,
     save_broker_profile,
     save_lead,
 )
 from services.models import ContactInfo, PBMAnalysisReport, SessionData, SessionStatus
-from services.report_gen import generate_pdf_report
+from services.sessions import SessionStore
 
 load_dotenv()
 
@@ -63,18 +68,62 @@ _DATA_DIR = os.getenv("DATA_DIR", os.path.dirname(__file__))
 REPORTS_DIR = os.path.join(_DATA_DIR, "reports")
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
-sessions: dict[str, SessionData] = {}
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+_UPLOAD_CHUNK_BYTES = 1 << 20
+
+sessions = SessionStore()
+SESSION_SWEEP_SECONDS = 300
+DB_MAINTENANCE_SECONDS = 3600
+
+
+async def _sweep_sessions():
+    """Periodically drop expired sessions so an idle server doesn't keep them around."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_SECONDS)
+        try:
+            await loop.run_in_executor(app.state.io_pool, sessions.purge_expired)
+        except Exception as e:
+            print(f"[Sessions] Sweep failed: {e}")
+
+
+async def _maintain_db():
+    """Periodically checkpoint the WAL and refresh SQLite's planner statistics
+    for the long-lived connections."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(DB_MAINTENANCE_SECONDS)
+        for task in (checkpoint_db, optimize_db):
+            try:
+                await loop.run_in_executor(app.state.io_pool, task)
+            except Exception as e:
+                print(f"[Leads] {task.__name__} failed: {e}")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Initialize leads database and start background knowledge updater
     init_db()
-    start_background_updater()
+    knowledge_updater = start_background_updater()
+    # Dedicated pools so quick lead/email/knowledge writes never queue behind
+    # document parsing; long Claude calls stay on the loop's default executor.
+    app.state.cpu_pool = ThreadPoolExecutor(max_workers=max(2, os.cpu_count() or 1), thread_name_prefix="cpu")
+    app.state.io_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="io")
+    sweeper = asyncio.create_task(_sweep_sessions())
+    db_maintenance = asyncio.create_task(_maintain_db())
     yield
+    sweeper.cancel()
+    db_maintenance.cancel()
+    try:
+        optimize_db()
+    except Exception as e:
+        print(f"[Leads] PRAGMA optimize failed: {e}")
+    knowledge_updater.cancel()
+    app.state.cpu_pool.shutdown(wait=False, cancel_futures=True)
+    app.state.io_pool.shutdown(wait=False, cancel_futures=True)
 
 
-app = FastAPI(title="PBM Contract Analyzer", lifespan=lifespan)
+app = FastAPI(title="PBM Contract Analyzer", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 _origins = ["http://localhost:5173", "http://localhost:3000", "http://127.0.0.1:5173"]
 _frontend_url = os.getenv("FRONTEND_URL", "").strip()
@@ -89,6 +138,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Analysis JSON is long prose and compresses well. GZipMiddleware leaves any
+# response that already declares a Content-Encoding alone, so binary files and
+# the chat event stream (which must not be buffered) are marked identity.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+_UNCOMPRESSED = {"Content-Encoding": "identity"}
+
 
 # ── Auth Dependency ───────────────────────────────────────────────────────────
 
@@ -149,7 +204,9 @@ async def get_me(user: UserOut = Depends(get_current_user)):
 async def forgot_password(req: ForgotPasswordRequest):
     token = create_reset_token(req.email)
     if token:
-        send_reset_email(req.email.lower().strip(), token)
+        # Resend call uses blocking requests — keep it off the event loop
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(app.state.io_pool, send_reset_email, req.email.lower().strip(), token)
     return {"success": True}
 
 
@@ -166,46 +223,71 @@ async def reset_password_endpoint(req: ResetPasswordRequest):
 
 # ── Analysis Endpoints ────────────────────────────────────────────────────────
 
-async def _run_analysis(session_id: str, text: str):
-    """Run analysis in thread pool to avoid blocking the event loop."""
+async def _run_analysis(session_id: str, path: str, filename: str):
+    """Extract text from the uploaded file and analyze it, both off the event loop."""
     loop = asyncio.get_event_loop()
+    try:
+        text = await loop.run_in_executor(app.state.cpu_pool, extract_text, path, filename)
+    except Exception as e:
+        _fail_session(session_id, f"Failed to read file: {str(e)}")
+        return
+    finally:
+        os.unlink(path)
+
+    if not text.strip():
+        _fail_session(session_id, "No readable text found in the file.")
+        return
+
     await loop.run_in_executor(
         None, analyze_contract_background, sessions, session_id, text
     )
 
 
+def _fail_session(session_id: str, error_message: str):
+    sessions.update(
+        session_id,
+        status=SessionStatus.ERROR,
+        status_message="Analysis failed",
+        error_message=error_message,
+    )
+
+
 @app.post("/api/analyze")
 async def analyze_contract(file: UploadFile = File(...), _user: UserOut = Depends(get_current_user)):
     filename = file.filename or ""
     if not filename.lower().endswith((".pdf", ".docx", ".doc")):
         raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported.")
 
-    file_bytes = await file.read()
-    if len(file_bytes) > 50 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File size must not exceed 50MB.")
-
+    # Stream the upload to disk in chunks so the whole file is never held in memory
+    suffix = os.path.splitext(filename)[1].lower()
+    upload = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
     try:
-        text = extract_text(file_bytes, filename)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to read file: {str(e)}")
-
-    if not text.strip():
-        raise HTTPException(status_code=400, detail="No readable text found in the file.")
-
-    session_id = str(uuid.uuid4())
-    sessions[session_id] = SessionData()
-
-    asyncio.create_task(_run_analysis(session_id, text))
+        with upload:
+            size = 0
+            while chunk := await file.read(_UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=400, detail="File size must not exceed 50MB.")
+                upload.write(chunk)
+    except BaseException:
+        os.unlink(upload.name)
+        raise
+
+    session_id = secrets.token_urlsafe(16)
+    sessions.put(session_id, SessionData(status_message="Extracting text from document..."))
+
+    # Text extraction happens in the background task; read failures surface via /api/status
+    asyncio.create_task(_run_analysis(session_id, upload.name, filename))
 
     return {"session_id": session_id}
 
 
 @app.get("/api/status/{session_id}")
 async def get_status(session_id: str, _user: UserOut = Depends(get_current_user)):
-    if session_id not in sessions:
+    session = _get_session(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found.")
 
-    session = sessions[session_id]
     return {
         "status": session.status,
         "status_message": session.status_message,
@@ -225,10 +307,11 @@ class ContactFormData(BaseModel):
 
 @app.post("/api/report/{session_id}")
 async def submit_contact_and_get_report(session_id: str, contact_data: ContactFormData, _user: UserOut = Depends(get_current_user)):
-    if session_id not in sessions:
-        raise HTTPException(status_code=404, detail="Session not found.")
+    from services.report_gen import generate_pdf_report
 
-    session = sessions[session_id]
+    session = _get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found.")
 
     if session.status != SessionStatus.COMPLETE:
         raise HTTPException(
@@ -237,38 +320,42 @@ async def submit_contact_and_get_report(session_id: str, contact_data: ContactFo
         )
 
     contact_info = ContactInfo(**contact_data.model_dump())
-    session.contact_info = contact_info
+    sessions.update(session_id, contact_info=contact_info)
 
     pdf_path = os.path.join(REPORTS_DIR, f"{session_id}.pdf")
+    loop = asyncio.get_event_loop()
     try:
         broker = get_broker_profile()
-        generate_pdf_report(session.analysis_result, contact_info, pdf_path, broker=broker)
-        session.pdf_path = pdf_path
+        # ReportLab layout is CPU-bound; render on the CPU pool so concurrent
+        # reports don't stall the event loop or each other
+        await loop.run_in_executor(
+            app.state.cpu_pool, generate_pdf_report, session.analysis_result, contact_info, pdf_path, broker
+        )
+        sessions.update(session_id, pdf_path=pdf_path)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate PDF report: {str(e)}")
 
     # Save lead to SQLite + fire email notification in background thread
-    loop = asyncio.get_event_loop()
     asyncio.ensure_future(
         loop.run_in_executor(
-            None, save_lead, contact_info, session.analysis_result, session_id
+            app.state.io_pool, save_lead, contact_info, session.analysis_result, session_id
         )
     )
 
-    return {
+    # Returned as a Response so the analysis payload skips jsonable_encoder
+    return ORJSONResponse({
         "success": True,
         "download_url": f"/api/download/{session_id}",
-        "analysis": session.analysis_result.model_dump(),
-    }
+        "analysis": session.analysis_result.model_dump(mode="json"),
+    })
 
 
 @app.get("/api/download/{session_id}")
 async def download_report(session_id: str, _user: UserOut = Depends(get_current_user)):
-    if session_id not in sessions:
+    session = _get_session(session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found.")
 
-    session = sessions[session_id]
-
     if not session.pdf_path or not os.path.exists(session.pdf_path):
         raise HTTPException(
             status_code=404,
@@ -286,6 +373,7 @@ async def download_report(session_id: str, _user: UserOut = Depends(get_current_
         session.pdf_path,
         media_type="application/pdf",
         filename=filename,
+        headers=_UNCOMPRESSED,
     )
 
 
@@ -303,10 +391,10 @@ async def export_leads(key: str = Query(..., description="Export secret key"), _
     if key != export_key:
         raise HTTPException(status_code=403, detail="Invalid export key.")
 
-    csv_content = export_leads_csv()
     filename = f"pbm_leads_{__import__('datetime').datetime.utcnow().strftime('%Y%m%d')}.csv"
-    return Response(
-        content=csv_content,
+    # Sync generator — Starlette iterates it in the threadpool, one row per chunk
+    return StreamingResponse(
+        export_leads_csv_iter(),
         media_type="text/csv",
         headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
@@ -334,7 +422,7 @@ async def generate_negotiation_letter_endpoint(session_id: str, _user: UserOut =
     return Response(
         content=docx_bytes,
         media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', **_UNCOMPRESSED},
     )
 
 
@@ -368,15 +456,15 @@ async def admin_scrub_concerns(key: str = Query(...), _user: UserOut = Depends(g
 async def get_stored_analysis(session_id: str, _user: UserOut = Depends(get_current_user)):
     """Re-hydrate a past analysis from the contract library."""
     # Check live session first
-    if session_id in sessions and sessions[session_id].status == SessionStatus.COMPLETE:
-        sess = sessions[session_id]
+    sess = sessions.get(session_id)
+    if sess and sess.status == SessionStatus.COMPLETE:
         has_pdf = bool(sess.pdf_path and os.path.exists(sess.pdf_path))
-        return {
-            "analysis": sess.analysis_result.model_dump(),
+        return ORJSONResponse({
+            "analysis": sess.analysis_result.model_dump(mode="json"),
             "download_url": f"/api/download/{session_id}" if has_pdf else None,
             "pbm_name": sess.analysis_result.contract_overview.parties,
             "uploaded_at": None,
-        }
+        })
 
     # Fall back to database
     row = get_contract_by_session(session_id)
@@ -391,25 +479,18 @@ async def get_stored_analysis(session_id: str, _user: UserOut = Depends(get_curr
         )
 
     try:
-        analysis = PBMAnalysisReport(**json.loads(analysis_json))
+        analysis = PBMAnalysisReport.model_validate_json(analysis_json)
     except Exception:
         raise HTTPException(status_code=500, detail="Stored analysis data is corrupted.")
 
-    # Restore in-memory session so download/chat/negotiate still work
-    sessions[session_id] = SessionData()
-    sessions[session_id].status = SessionStatus.COMPLETE
-    sessions[session_id].analysis_result = analysis
-    pdf_path = os.path.join(REPORTS_DIR, f"{session_id}.pdf")
-    if os.path.exists(pdf_path):
-        sessions[session_id].pdf_path = pdf_path
-
-    has_pdf = bool(sessions[session_id].pdf_path)
-    return {
-        "analysis": analysis.model_dump(),
+    # Restore the session so download/chat/negotiate still work
+    has_pdf = bool(_restore_session(session_id, analysis).pdf_path)
+    return ORJSONResponse({
+        "analysis": analysis.model_dump(mode="json"),
         "download_url": f"/api/download/{session_id}" if has_pdf else None,
         "pbm_name": row.get("pbm_name"),
         "uploaded_at": row.get("uploaded_at"),
-    }
+    })
 
 
 # ── Contract Comparison ───────────────────────────────────────────────────────
@@ -465,7 +546,7 @@ class ChatRequest(BaseModel):
 @app.post("/api/chat/{session_id}")
 async def chat_with_contract(session_id: str, request: ChatRequest, _user: UserOut = Depends(get_current_user)):
     """Stream an answer to a broker question about the contract."""
-    row = get_contract_by_session(session_id)
+    row = get_contract_by_session(session_id, include_text=True)
     if not row:
         raise HTTPException(status_code=404, detail="Contract not found in library.")
 
@@ -516,7 +597,7 @@ async def chat_with_contract(session_id: str, request: ChatRequest, _user: UserO
     return StreamingResponse(
         generate(),
         media_type="text/event-stream",
-        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **_UNCOMPRESSED},
     )
 
 
@@ -540,7 +621,7 @@ async def generate_rfp_export_endpoint(session_id: str, _user: UserOut = Depends
     return Response(
         content=xlsx_bytes,
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', **_UNCOMPRESSED},
     )
 
 
@@ -565,7 +646,7 @@ async def get_glossary():
 async def trigger_knowledge_update(_user: UserOut = Depends(get_current_user)):
     """Manually trigger a knowledge base update from public sources."""
     loop = asyncio.get_event_loop()
-    result = await loop.run_in_executor(None, update_knowledge_base)
+    result = await loop.run_in_executor(app.state.io_pool, update_knowledge_base)
     return {"success": True, **result}
 
 
@@ -626,7 +707,7 @@ async def get_broker_logo(_user: UserOut = Depends(get_current_user)):
     profile = get_broker_profile()
     if not profile or not profile.get("logo_path") or not os.path.exists(profile["logo_path"]):
         raise HTTPException(status_code=404, detail="No broker logo set.")
-    return FileResponse(profile["logo_path"])
+    return FileResponse(profile["logo_path"], headers=_UNCOMPRESSED)
 
 
 # ── Health Check ──────────────────────────────────────────────────────────────
@@ -663,26 +744,38 @@ async def compare_revisions(
 
 # ── Internal helpers ──────────────────────────────────────────────────────────
 
-def _get_analysis(session_id: str) -> Optional[PBMAnalysisReport]:
-    """Return the PBMAnalysisReport for a session, checking memory then the DB."""
-    if session_id in sessions and sessions[session_id].status == SessionStatus.COMPLETE:
-        return sessions[session_id].analysis_result
+def _restore_session(session_id: str, analysis: PBMAnalysisReport) -> SessionData:
+    """Recreate a completed session from a stored analysis and its PDF, if present."""
+    session = SessionData(status=SessionStatus.COMPLETE, analysis_result=analysis)
+    pdf_path = os.path.join(REPORTS_DIR, f"{session_id}.pdf")
+    if os.path.exists(pdf_path):
+        session.pdf_path = pdf_path
+    sessions.put(session_id, session)
+    return session
+
+
+def _get_session(session_id: str) -> Optional[SessionData]:
+    """Return a session from the store, restoring completed ones from the library once they expire."""
+    session = sessions.get(session_id)
+    if session is not None:
+        return session
 
     row = get_contract_by_session(session_id)
     if row and row.get("analysis_json"):
         try:
-            analysis = PBMAnalysisReport(**json.loads(row["analysis_json"]))
+            analysis = PBMAnalysisReport.model_validate_json(row["analysis_json"])
         except Exception:
             return None
-        # Restore session so subsequent calls (download, chat) work without DB hit
-        sessions[session_id] = SessionData()
-        sessions[session_id].status = SessionStatus.COMPLETE
-        sessions[session_id].analysis_result = analysis
-        pdf_path = os.path.join(REPORTS_DIR, f"{session_id}.pdf")
-        if os.path.exists(pdf_path):
-            sessions[session_id].pdf_path = pdf_path
-        return analysis
+        return _restore_session(session_id, analysis)
+
+    return None
+
 
+def _get_analysis(session_id: str) -> Optional[PBMAnalysisReport]:
+    """Return the PBMAnalysisReport for a session, checking the session store then the DB."""
+    session = _get_session(session_id)
+    if session and session.status == SessionStatus.COMPLETE:
+        return session.analysis_result
     return None
 
 
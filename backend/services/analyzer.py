@@ -4,6 +4,8 @@ Uses the Files API for efficient document handling and extended thinking
 for deep domain-specific contract analysis.
 """
 
+import hashlib
+import json
 import os
 import anthropic
 from .models import (
@@ -16,8 +18,8 @@ from .models import (
     SavingsItem,
     SessionStatus,
 )
-from .knowledge import load_knowledge, format_knowledge_for_prompt, record_analysis_insights
-from .leads import save_contract, get_library_benchmarks
+from .knowledge import load_knowledge_readonly, knowledge_version, format_knowledge_for_prompt, record_analysis_insights
+from .leads import save_contract, get_library_benchmarks, get_cached_analysis, save_cached_analysis, library_version
 
 _GRADE_ORDER = {"A": 4, "B": 3, "C": 2, "D": 1, "F": 0}
 
@@ -25,7 +27,12 @@ _GRADE_ORDER = {"A": 4, "B": 3, "C": 2, "D": 1, "F": 0}
 def _build_library_comparison(analysis: PBMAnalysisReport, benchmarks: dict) -> LibraryComparison:
     total = benchmarks["contracts_count"]
     this_order = _GRADE_ORDER.get(analysis.overall_grade, 2)
-    worse = sum(1 for g in benchmarks["grades"] if _GRADE_ORDER.get(g, 2) < this_order)
+    # Count from the per-grade tallies rather than scanning every contract's grade;
+    # grades outside A–F rank as C, matching _GRADE_ORDER.get(g, 2)
+    dist = benchmarks["grade_distribution"]
+    worse = sum(n for g, n in dist.items() if _GRADE_ORDER[g] < this_order)
+    if 2 < this_order:
+        worse += total - sum(dist.values())
     pct = round(worse / total * 100) if total > 0 else 0
     if pct > 50:
         grade_percentile = f"top {max(1, 100 - pct)}%"
@@ -164,9 +171,48 @@ ANALYSIS_TOOL = {
     }
 }
 
+# Tools list sent with every analysis, built once. The cache breakpoint lets the
+# API reuse the processed tool schema (~1.7k tokens) across requests even when
+# the knowledge-driven system prompt after it has changed.
+_ANALYSIS_TOOLS = [{**ANALYSIS_TOOL, "cache_control": {"type": "ephemeral"}}]
+
+_ANALYSIS_MODEL = "claude-sonnet-4-6"
+
+_ANALYSIS_INSTRUCTIONS = (
+    "Please perform a comprehensive analysis of this PBM contract. "
+    "Extract all pricing terms, identify cost risk areas, compare to market benchmarks, "
+    "and provide specific negotiation guidance. "
+    "Use the analyze_pbm_contract tool to return your complete structured findings.\n\n"
+    "CONTRACT TEXT:"
+)
+
+# Cached analyses are keyed on the contract text plus the model and tool schema
+# that produced them, so a schema change never serves a stale shape
+_ANALYSIS_SCHEMA_HASH = hashlib.blake2b(
+    json.dumps([_ANALYSIS_MODEL, ANALYSIS_TOOL], sort_keys=True).encode(), digest_size=8
+).hexdigest()
+ANALYSIS_CACHE_MAX_AGE = int(os.getenv("ANALYSIS_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+
+
+# (key, prompt) of the last built system prompt, swapped as one tuple
+_system_prompt_cache: tuple = (None, "")
+
 
 def build_system_prompt() -> str:
-    knowledge = load_knowledge()
+    """Return the system prompt, rebuilding it only when the knowledge base or library changes."""
+    global _system_prompt_cache
+    # The prompt embeds the knowledge base and the library benchmarks, so it is
+    # keyed on their content versions; session and lead writes don't touch either
+    knowledge = load_knowledge_readonly()
+    key = (knowledge_version(knowledge), library_version())
+    cached_key, prompt = _system_prompt_cache
+    if key != cached_key:
+        prompt = _render_system_prompt(knowledge)
+        _system_prompt_cache = (key, prompt)
+    return prompt
+
+
+def _render_system_prompt(knowledge) -> str:
     knowledge_text = format_knowledge_for_prompt(knowledge)
 
     return f"""You are an expert PBM (Pharmacy Benefit Manager) contract analyst with 20+ years of experience evaluating pharmacy benefit contracts for employer groups, health plans, and benefits consultants.
@@ -209,78 +255,38 @@ When generating savings_opportunities, consult the biosimilar_opportunities, pat
 - savings_opportunities are independent employer/broker actions; negotiation_guidance requires PBM cooperation. Keep them distinct."""
 
 
-def analyze_contract_background(sessions: dict, session_id: str, text: str) -> None:
-    client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-
+def analyze_contract_background(sessions, session_id: str, text: str) -> None:
     try:
-        sessions[session_id].status = SessionStatus.PROCESSING
-        sessions[session_id].status_message = "Reading and parsing contract terms..."
-
-        system_prompt = build_system_prompt()
-
-        # Pass contract text directly — keeps compatibility with streaming + adaptive thinking
-        text_truncated = text[:120000]
-        messages = [
-            {
-                "role": "user",
-                "content": (
-                    "Please perform a comprehensive analysis of this PBM contract. "
-                    "Extract all pricing terms, identify cost risk areas, compare to market benchmarks, "
-                    "and provide specific negotiation guidance. "
-                    "Use the analyze_pbm_contract tool to return your complete structured findings.\n\n"
-                    f"CONTRACT TEXT:\n{text_truncated}"
-                ),
-            }
-        ]
-
-        sessions[session_id].status_message = "Analyzing pricing terms and contract structure..."
-
-        response = _call_claude_with_fallbacks(
-            client=client,
-            system_prompt=system_prompt,
-            messages=messages,
+        sessions.update(
+            session_id,
+            status=SessionStatus.PROCESSING,
+            status_message="Reading and parsing contract terms...",
         )
 
-        sessions[session_id].status_message = "Comparing to market benchmarks..."
-
-        tool_use_block = next(
-            (b for b in response.content if getattr(b, "type", None) == "tool_use" and b.name == "analyze_pbm_contract"),
-            None,
-        )
-
-        if not tool_use_block:
-            raise ValueError("Claude did not return structured analysis data. Please try again.")
-
-        sessions[session_id].status_message = "Generating recommendations..."
-
-        data = tool_use_block.input
-        savings_opps = [
-            SavingsItem(
-                category=item["category"],
-                drug_or_area=item["drug_or_area"],
-                opportunity=item["opportunity"],
-                estimated_impact=item["estimated_impact"],
-                action_required=item["action_required"],
-            )
-            for item in data.get("savings_opportunities", [])
-            if isinstance(item, dict)
-        ]
-        analysis = PBMAnalysisReport(
-            executive_summary=data["executive_summary"],
-            contract_overview=ContractOverview(**data["contract_overview"]),
-            pricing_terms=PricingTerms(**data["pricing_terms"]),
-            cost_risk_areas=[CostRiskItem(**item) for item in data["cost_risk_areas"]],
-            market_comparison=MarketComparison(**data["market_comparison"]),
-            negotiation_guidance=data["negotiation_guidance"],
-            overall_grade=data["overall_grade"],
-            key_concerns=data["key_concerns"],
-            savings_opportunities=savings_opps,
+        # Identical uploads reuse the stored result instead of calling Claude again
+        text_hash = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        analysis = None
+        try:
+            cached = get_cached_analysis(text_hash, _ANALYSIS_SCHEMA_HASH, ANALYSIS_CACHE_MAX_AGE)
+            if cached:
+                analysis = PBMAnalysisReport.model_validate_json(cached)
+        except Exception as e:
+            print(f"[Analyzer] Analysis cache lookup failed: {e}")
+
+        if analysis is None:
+            analysis = _analyze_with_claude(sessions, session_id, text)
+            try:
+                save_cached_analysis(text_hash, _ANALYSIS_SCHEMA_HASH, analysis.model_dump_json())
+            except Exception as e:
+                print(f"[Analyzer] Failed to cache analysis: {e}")
+
+        sessions.update(
+            session_id,
+            analysis_result=analysis,
+            status=SessionStatus.COMPLETE,
+            status_message="Analysis complete",
         )
 
-        sessions[session_id].analysis_result = analysis
-        sessions[session_id].status = SessionStatus.COMPLETE
-        sessions[session_id].status_message = "Analysis complete"
-
         # Learn from this analysis
         try:
             record_analysis_insights(analysis)
@@ -293,16 +299,86 @@ def analyze_contract_background(sessions: dict, session_id: str, text: str) -> N
             benchmarks = get_library_benchmarks()
             if benchmarks.get("contracts_count", 0) >= 3:
                 analysis.library_comparison = _build_library_comparison(analysis, benchmarks)
+                sessions.update(session_id, analysis_result=analysis)
         except Exception as e:
             print(f"[Analyzer] Failed to save/compare contract library: {e}")
 
     except Exception as e:
-        sessions[session_id].status = SessionStatus.ERROR
-        sessions[session_id].status_message = "Analysis failed"
-        sessions[session_id].error_message = str(e)
+        sessions.update(
+            session_id,
+            status=SessionStatus.ERROR,
+            status_message="Analysis failed",
+            error_message=str(e),
+        )
         print(f"[Analyzer] Error for session {session_id}: {e}")
 
 
+def _analyze_with_claude(sessions, session_id: str, text: str) -> PBMAnalysisReport:
+    client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+
+    system_prompt = build_system_prompt()
+
+    # Pass contract text directly — keeps compatibility with streaming + adaptive thinking.
+    # It goes in its own content block so the (multi-MB) text is never copied into the prompt string.
+    text_truncated = text[:120000]
+    messages = [
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": _ANALYSIS_INSTRUCTIONS},
+                {"type": "text", "text": text_truncated},
+            ],
+        }
+    ]
+
+    sessions.update(session_id, status_message="Analyzing pricing terms and contract structure...")
+
+    response = _call_claude_with_fallbacks(
+        client=client,
+        system_prompt=system_prompt,
+        messages=messages,
+    )
+
+    sessions.update(session_id, status_message="Comparing to market benchmarks...")
+
+    # Every SDK content block carries .type; with a forced tool_choice the match is normally first
+    tool_use_block = None
+    for block in response.content:
+        if block.type == "tool_use" and block.name == "analyze_pbm_contract":
+            tool_use_block = block
+            break
+
+    if not tool_use_block:
+        raise ValueError("Claude did not return structured analysis data. Please try again.")
+
+    sessions.update(session_id, status_message="Generating recommendations...")
+
+    data = tool_use_block.input
+    savings_opps = [
+        SavingsItem(
+            category=item["category"],
+            drug_or_area=item["drug_or_area"],
+            opportunity=item["opportunity"],
+            estimated_impact=item["estimated_impact"],
+            action_required=item["action_required"],
+        )
+        for item in data.get("savings_opportunities", [])
+        if isinstance(item, dict)
+    ]
+    analysis = PBMAnalysisReport(
+        executive_summary=data["executive_summary"],
+        contract_overview=ContractOverview(**data["contract_overview"]),
+        pricing_terms=PricingTerms(**data["pricing_terms"]),
+        cost_risk_areas=[CostRiskItem(**item) for item in data["cost_risk_areas"]],
+        market_comparison=MarketComparison(**data["market_comparison"]),
+        negotiation_guidance=data["negotiation_guidance"],
+        overall_grade=data["overall_grade"],
+        key_concerns=data["key_concerns"],
+        savings_opportunities=savings_opps,
+    )
+    return analysis
+
+
 def _call_claude_with_fallbacks(client, system_prompt, messages):
     """
     Call Claude for contract analysis.
@@ -310,10 +386,10 @@ def _call_claude_with_fallbacks(client, system_prompt, messages):
     high max_tokens budget and rely on Opus 4.6's native reasoning ability.
     """
     return client.messages.create(
-        model="claude-sonnet-4-6",
+        model=_ANALYSIS_MODEL,
         max_tokens=8000,
         system=system_prompt,
         messages=messages,
-        tools=[ANALYSIS_TOOL],
+        tools=_ANALYSIS_TOOLS,
         tool_choice={"type": "tool", "name": "analyze_pbm_contract"},
     )
@@ -14,7 +14,7 @@ import bcrypt
 import jwt
 from pydantic import BaseModel
 
-from .leads import DB_PATH
+from .leads import DB_PATH, _reader, _writer, resend_http
 
 
 def _hash_password(password: str) -> str:
@@ -99,7 +99,7 @@ def create_user(email: str, password: str, first_name: str, last_name: str) -> U
     password_hash = _hash_password(password)
     created_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
     try:
-        with sqlite3.connect(DB_PATH) as conn:
+        with _writer() as conn:
             cursor = conn.execute(
                 """
                 INSERT INTO users (email, password_hash, first_name, last_name, created_at)
@@ -107,7 +107,6 @@ def create_user(email: str, password: str, first_name: str, last_name: str) -> U
                 """,
                 (email.lower().strip(), password_hash, first_name.strip(), last_name.strip(), created_at),
             )
-            conn.commit()
             user_id = cursor.lastrowid
     except sqlite3.IntegrityError:
         raise ValueError("An account with this email already exists.")
@@ -117,8 +116,7 @@ def create_user(email: str, password: str, first_name: str, last_name: str) -> U
 
 def authenticate_user(email: str, password: str) -> Optional[UserOut]:
     """Verify email + password. Returns UserOut or None."""
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
+    with _reader() as conn:
         row = conn.execute(
             "SELECT id, email, password_hash, first_name, last_name FROM users WHERE email = ?",
             (email.lower().strip(),),
@@ -134,8 +132,7 @@ def authenticate_user(email: str, password: str) -> Optional[UserOut]:
 
 def get_user_by_id(user_id: int) -> Optional[UserOut]:
     """Lookup user by ID for JWT validation."""
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
+    with _reader() as conn:
         row = conn.execute(
             "SELECT id, email, first_name, last_name FROM users WHERE id = ?",
             (user_id,),
@@ -179,7 +176,7 @@ def _hash_token(token: str) -> str:
 
 def create_reset_token(email: str) -> Optional[str]:
     """Generate a reset token for the given email. Returns None if email not found."""
-    with sqlite3.connect(DB_PATH) as conn:
+    with _writer() as conn:
         row = conn.execute("SELECT id FROM users WHERE email = ?", (email.lower().strip(),)).fetchone()
         if not row:
             return None
@@ -190,15 +187,13 @@ def create_reset_token(email: str) -> Optional[str]:
             "UPDATE users SET reset_token = ?, reset_token_expires = ? WHERE id = ?",
             (token_hash, expires, row[0]),
         )
-        conn.commit()
     return raw_token
 
 
 def validate_reset_token(token: str) -> Optional[int]:
     """Check if a reset token is valid and not expired. Returns user_id or None."""
     token_hash = _hash_token(token)
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
+    with _reader() as conn:
         row = conn.execute(
             "SELECT id, reset_token_expires FROM users WHERE reset_token = ?",
             (token_hash,),
@@ -217,19 +212,16 @@ def reset_password(token: str, new_password: str) -> Optional[UserOut]:
     if user_id is None:
         return None
     password_hash = _hash_password(new_password)
-    with sqlite3.connect(DB_PATH) as conn:
+    with _writer() as conn:
         conn.execute(
             "UPDATE users SET password_hash = ?, reset_token = NULL, reset_token_expires = NULL WHERE id = ?",
             (password_hash, user_id),
         )
-        conn.commit()
     return get_user_by_id(user_id)
 
 
 def send_reset_email(email: str, token: str) -> None:
     """Send a password reset link via Resend API."""
-    import requests as _requests
-
     api_key = os.getenv("RESEND_API_KEY", "").strip()
     from_address = os.getenv("NOTIFY_FROM", "PBM Analyzer <onboarding@resend.dev>")
     frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173").rstrip("/")
@@ -259,7 +251,7 @@ def send_reset_email(email: str, token: str) -> None:
     </div>
     """
 
-    _requests.post(
+    resend_http.post(
         "https://api.resend.com/emails",
         headers={"Authorization": f"Bearer {api_key}"},
         json={
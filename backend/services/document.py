@@ -1,41 +1,178 @@
 import io
+import multiprocessing
+import os
+import posixpath
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Optional
+
 import pdfplumber
-from docx import Document as DocxDocument
+import pypdfium2 as pdfium
+from lxml import etree
 
+# PDFium (C) is the primary PDF text extractor. It is not thread-safe, so
+# calls are serialised; at its speed the lock is not a bottleneck.
+_pdfium_lock = threading.Lock()
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    text_parts = []
-    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-        for i, page in enumerate(pdf.pages):
-            text = page.extract_text()
-            if text and text.strip():
-                text_parts.append(f"--- Page {i + 1} ---\n{text.strip()}")
-    return "\n\n".join(text_parts)
+# Fallback path: pdfminer is pure Python, so page extraction only scales across processes.
+# Small contracts stay in-process where the pool hand-off would dominate.
+_PDF_WORKERS = min(8, os.cpu_count() or 1)
+_PDF_PARALLEL_MIN_PAGES = 8
+
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=_PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pdf_pool
+
+
+def _extract_page_range(path: str, start: int, stop: int) -> list[Optional[str]]:
+    with pdfplumber.open(path) as pdf:
+        return [pdf.pages[i].extract_text() for i in range(start, stop)]
+
+
+def _extract_pages_pdfium(path: str) -> list[str]:
+    texts = []
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(path)
+        try:
+            for page in pdf:
+                textpage = page.get_textpage()
+                texts.append(textpage.get_text_range().replace("\r\n", "\n"))
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+    return texts
+
+
+def _extract_pages_pdfplumber(path: str) -> list[Optional[str]]:
+    with pdfplumber.open(path) as pdf:
+        page_count = len(pdf.pages)
+        if _PDF_WORKERS < 2 or page_count < _PDF_PARALLEL_MIN_PAGES:
+            return [page.extract_text() for page in pdf.pages]
 
+    # Contiguous page ranges, one per worker; map() keeps them in order
+    step = -(-page_count // _PDF_WORKERS)
+    starts = range(0, page_count, step)
+    stops = [min(s + step, page_count) for s in starts]
+    chunks = _get_pdf_pool().map(_extract_page_range, repeat(path), starts, stops)
+    return [text for chunk in chunks for text in chunk]
 
-def extract_text_from_docx(file_bytes: bytes) -> str:
-    doc = DocxDocument(io.BytesIO(file_bytes))
+
+def extract_text_from_pdf(path: str) -> str:
+    try:
+        page_texts = _extract_pages_pdfium(path)
+    except Exception as e:
+        # Files PDFium rejects (unusual encryption, damaged xref) may still parse with pdfminer
+        print(f"[Document] PDFium extraction failed, falling back to pdfplumber: {e}")
+        page_texts = _extract_pages_pdfplumber(path)
+
+    # Write fragments straight into one buffer instead of building and joining page strings
+    buf = io.StringIO()
+    for i, text in enumerate(page_texts):
+        if text and (text := text.strip()):
+            if buf.tell():
+                buf.write("\n\n")
+            buf.write("--- Page ")
+            buf.write(str(i + 1))
+            buf.write(" ---\n")
+            buf.write(text)
+    return buf.getvalue()
+
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_DOCX_P, _DOCX_TR, _DOCX_TC = _W + "p", _W + "tr", _W + "tc"
+# mc:Fallback repeats the content of its mc:Choice sibling (e.g. text boxes)
+_DOCX_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_DOCX_RUN_TEXT = {_W + "t": None, _W + "tab": "\t", _W + "br": "\n", _W + "cr": "\n"}
+_OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+# Uploaded XML is untrusted: never load DTDs or resolve entities (XXE), never touch the network
+_SAFE_XML = dict(resolve_entities=False, no_network=True, huge_tree=False, load_dtd=False)
+_SAFE_PARSER = etree.XMLParser(**_SAFE_XML)
+
+
+def _docx_main_part(docx: zipfile.ZipFile) -> str:
+    try:
+        rels = etree.fromstring(docx.read("_rels/.rels"), _SAFE_PARSER)
+    except KeyError:
+        return "word/document.xml"
+    for rel in rels:
+        if rel.get("Type") == _OFFICE_DOCUMENT_REL:
+            return posixpath.normpath(rel.get("Target", "").lstrip("/"))
+    return "word/document.xml"
+
+
+def _docx_paragraph_text(p) -> str:
+    parts = []
+    for node in p.iter(*_DOCX_RUN_TEXT):
+        sub = _DOCX_RUN_TEXT[node.tag]
+        parts.append((node.text or "") if sub is None else sub)
+    return "".join(parts)
+
+
+def extract_text_from_docx(path: str) -> str:
+    # Stream document.xml rather than building python-docx's object model.
+    # Paragraphs and table rows come out in document order; rows keep the
+    # "cell | cell" layout and each merged cell is emitted once.
     text_parts = []
+    rows: list[list[str]] = []   # cell texts of each open table row (tables can nest)
+    cells: list[list[str]] = []  # paragraph texts of each open table cell
+    in_fallback = 0
+
+    def emit(text: str):
+        if cells:
+            cells[-1].append(text)
+        elif text.strip():
+            text_parts.append(text.strip())
 
-    for paragraph in doc.paragraphs:
-        if paragraph.text.strip():
-            text_parts.append(paragraph.text.strip())
+    with zipfile.ZipFile(path) as docx, docx.open(_docx_main_part(docx)) as xml:
+        tags = (_DOCX_P, _DOCX_TR, _DOCX_TC, _DOCX_FALLBACK)
+        for event, elem in etree.iterparse(xml, events=("start", "end"), tag=tags, **_SAFE_XML):
+            tag = elem.tag
+            if tag == _DOCX_FALLBACK:
+                in_fallback += 1 if event == "start" else -1
+            elif in_fallback:
+                pass
+            elif event == "start":
+                if tag == _DOCX_TR:
+                    rows.append([])
+                elif tag == _DOCX_TC:
+                    cells.append([])
+                continue
+            elif tag == _DOCX_P:
+                emit(_docx_paragraph_text(elem))
+            elif tag == _DOCX_TC:
+                rows[-1].append("\n".join(cells.pop()).strip())
+            else:
+                emit(" | ".join(c for c in rows.pop() if c))
 
-    for table in doc.tables:
-        for row in table.rows:
-            row_cells = [cell.text.strip() for cell in row.cells]
-            row_text = " | ".join(c for c in row_cells if c)
-            if row_text.strip():
-                text_parts.append(row_text)
+            if event == "end":
+                # Finished elements are no longer needed; keep memory flat
+                elem.clear()
+                parent = elem.getparent()
+                if parent is not None:
+                    while elem.getprevious() is not None:
+                        del parent[0]
 
     return "\n".join(text_parts)
 
 
-def extract_text(file_bytes: bytes, filename: str) -> str:
+def extract_text(path: str, filename: str) -> str:
     ext = filename.lower().rsplit(".", 1)[-1] if "." in filename else ""
     if ext == "pdf":
-        return extract_text_from_pdf(file_bytes)
+        return extract_text_from_pdf(path)
     elif ext in ("docx", "doc"):
-        return extract_text_from_docx(file_bytes)
+        return extract_text_from_docx(path)
     else:
         raise ValueError(f"Unsupported file type: .{ext}. Please upload a PDF or DOCX file.")
@@ -6,20 +6,42 @@ legislation, and industry trends. Updates automatically from public sources
 and learns from each contract analysis performed.
 """
 
-import json
+import asyncio
+import atexit
+import copy
+import hashlib
+import heapq
 import os
+import tempfile
 import threading
-import time
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from types import MappingProxyType
+from typing import Iterator, Mapping, Optional
+from urllib3.util.retry import Retry
 
 _DATA_DIR = os.getenv("DATA_DIR", str(Path(__file__).parent.parent))
 KNOWLEDGE_FILE = Path(_DATA_DIR) / "knowledge" / "pbm_knowledge.json"
+KNOWLEDGE_FILE.parent.mkdir(parents=True, exist_ok=True)
 
 _lock = threading.Lock()
 
+# Shared session so repeated public-source fetches reuse pooled keep-alive connections
+_http = requests.Session()
+_http.headers["User-Agent"] = "pbmanalyzer-knowledge/1.0"
+# Retry transient gateway errors with a short backoff rather than waiting a day
+_http.mount("https://", HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=4,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+))
+atexit.register(_http.close)
+
 # ── Curated benchmarks embedded in code ──────────────────────────────────────
 # These are merged into knowledge.json on every load, so Railway deployments
 # automatically refresh the benchmark section without touching volume data.
@@ -293,6 +315,19 @@ _CURATED_BENCHMARKS = {
     "last_benchmark_update": "2026-02-26",
 }
 
+
+def _freeze(value):
+    """Read-only view of nested curated data: dicts become mapping proxies, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+# Shared by every loaded knowledge dict, so accidental mutation must fail loudly
+_CURATED_BENCHMARKS = _freeze(_CURATED_BENCHMARKS)
+
 _CURATED_STATIC = {
     "legislation": [
         {
@@ -1026,89 +1061,237 @@ PBM_GLOSSARY = [
 ]
 
 
-def load_knowledge() -> dict:
+# Sections replaced with the curated copies on every load. They are never
+# written back, so the file only holds what is actually learned or fetched.
+_ALWAYS_OVERLAID = {
+    "market_benchmarks": _CURATED_BENCHMARKS,
+    "biosimilar_opportunities": _BIOSIMILAR_OPPORTUNITIES,
+    "patent_cliff_generics": _PATENT_CLIFF_GENERICS,
+    "alternative_pharmacy_programs": _ALTERNATIVE_PHARMACY_PROGRAMS,
+    "manufacturer_coupon_provisions": _MANUFACTURER_COUPON_PROVISIONS,
+}
+
+
+# (mtime_ns, parsed data) of the knowledge file, reused while its mtime is
+# unchanged. Swapped as a single tuple so lock-free readers always see a
+# matching pair; the parsed data itself is never mutated or handed out, and
+# callers get a deep copy since they mutate the result.
+_cache: tuple = (None, None)
+
+
+def load_knowledge(include_curated: bool = True) -> dict:
+    """Return a private, mutable copy of the knowledge base. Callers that only
+    touch learned or fetched sections can skip the curated overlays."""
+    return _load(copy.deepcopy, include_curated)
+
+
+def load_knowledge_readonly() -> Mapping:
+    """Return a read-only view sharing the cached data, for callers that only
+    format or report on the knowledge and so don't need their own copy."""
+    return MappingProxyType(_load(dict))
+
+
+def _load(clone, include_curated: bool = True) -> dict:
+    # Cache hits don't take the lock, so concurrent readers never queue;
+    # only a changed or missing file falls through to the locked reload
+    mtime_ns, cached = _cache
+    try:
+        if KNOWLEDGE_FILE.stat().st_mtime_ns == mtime_ns:
+            data = clone(cached)
+            return _apply_overlays(data) if include_curated else data
+    except FileNotFoundError:
+        pass
     with _lock:
-        if KNOWLEDGE_FILE.exists():
-            with open(KNOWLEDGE_FILE, "r") as f:
-                data = json.load(f)
-        else:
-            data = {}
+        return _load_nolock(clone, include_curated)
+
+
+def save_knowledge(knowledge: dict):
+    with _lock:
+        _save_nolock(knowledge)
+
+
+@contextmanager
+def knowledge_txn(include_curated: bool = True) -> Iterator[dict]:
+    """Load, mutate and save the knowledge base under one lock hold, so
+    concurrent read-modify-write cycles can't overwrite each other's changes.
+    Nothing is saved if the block raises."""
+    with _lock:
+        knowledge = _load_nolock(include_curated=include_curated)
+        yield knowledge
+        _save_nolock(knowledge)
+
+
+def _load_nolock(clone=copy.deepcopy, include_curated: bool = True) -> dict:
+    global _cache
+    try:
+        mtime_ns = KNOWLEDGE_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        data = {}
+    else:
+        cached_mtime_ns, cached = _cache
+        if mtime_ns != cached_mtime_ns:
+            cached = orjson.loads(KNOWLEDGE_FILE.read_bytes())
+            _cache = (mtime_ns, cached)
+        data = clone(cached)
+    return _apply_overlays(data) if include_curated else data
+
+
+def _apply_overlays(data: dict) -> dict:
     # Always overlay curated static data so deployments refresh benchmarks
-    data["market_benchmarks"] = _CURATED_BENCHMARKS
+    # and market intelligence
+    data.update(_ALWAYS_OVERLAID)
     if not data.get("legislation"):
         data["legislation"] = _CURATED_STATIC["legislation"]
     if not data.get("industry_trends"):
         data["industry_trends"] = _CURATED_STATIC["industry_trends"]
-    # Always overlay curated market intelligence (refreshed on every deploy)
-    data["biosimilar_opportunities"] = _BIOSIMILAR_OPPORTUNITIES
-    data["patent_cliff_generics"] = _PATENT_CLIFF_GENERICS
-    data["alternative_pharmacy_programs"] = _ALTERNATIVE_PHARMACY_PROGRAMS
-    data["manufacturer_coupon_provisions"] = _MANUFACTURER_COUPON_PROVISIONS
     return data
 
 
-def save_knowledge(knowledge: dict):
+def _save_nolock(knowledge: dict):
+    global _cache
     knowledge["last_updated"] = datetime.now(timezone.utc).isoformat()
     knowledge["update_count"] = knowledge.get("update_count", 0) + 1
-    with _lock:
-        KNOWLEDGE_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(KNOWLEDGE_FILE, "w") as f:
-            json.dump(knowledge, f, indent=2)
+    persisted = {k: v for k, v in knowledge.items() if k not in _ALWAYS_OVERLAID}
+    buf = orjson.dumps(persisted)
+    _write_atomic(KNOWLEDGE_FILE, buf)
+    _cache = (KNOWLEDGE_FILE.stat().st_mtime_ns, orjson.loads(buf))
+
+
+def _write_atomic(path: Path, data: bytes):
+    """Write to a temp file in the same directory and rename it over the target,
+    so a crash mid-write never leaves a truncated knowledge file behind."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        os.fchmod(fd, 0o644)  # mkstemp creates 0600
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def knowledge_version(knowledge: Mapping) -> tuple:
+    """Identify the knowledge content. Every save bumps update_count and
+    last_updated, so together with analyses_count they change on any edit."""
+    return (
+        knowledge.get("update_count"),
+        knowledge.get("last_updated"),
+        knowledge.get("market_intelligence", {}).get("analyses_count"),
+    )
+
+
+# (key, status) of the last get_knowledge_status result, swapped as one tuple
+_status_cache: tuple = (None, None)
 
 
 def get_knowledge_status() -> dict:
-    from .leads import get_library_benchmarks
-    knowledge = load_knowledge()
-    library = get_library_benchmarks()
-    return {
-        "last_updated": knowledge.get("last_updated", "Never"),
-        "update_count": knowledge.get("update_count", 0),
-        "analyses_count": knowledge.get("market_intelligence", {}).get("analyses_count", 0),
-        "legislation_count": len(knowledge.get("legislation", [])),
-        "industry_trends_count": len(knowledge.get("industry_trends", [])),
-        "recent_updates": knowledge.get("knowledge_updates", [])[-5:],
-        "contracts_in_library": library.get("contracts_count", 0),
-    }
+    from .leads import get_library_benchmarks, library_version
+    global _status_cache
+    # Dashboard polling hits this repeatedly; recompute only when the
+    # knowledge content or the contract library has actually changed
+    knowledge = load_knowledge_readonly()
+    key = (knowledge_version(knowledge), library_version())
+    cached_key, status = _status_cache
+    if key != cached_key:
+        library = get_library_benchmarks()
+        status = {
+            "last_updated": knowledge.get("last_updated", "Never"),
+            "update_count": knowledge.get("update_count", 0),
+            "analyses_count": knowledge.get("market_intelligence", {}).get("analyses_count", 0),
+            "legislation_count": len(knowledge.get("legislation", [])),
+            "industry_trends_count": len(knowledge.get("industry_trends", [])),
+            "recent_updates": knowledge.get("knowledge_updates", [])[-5:],
+            "contracts_in_library": library.get("contracts_count", 0),
+        }
+        _status_cache = (key, status)
+    return dict(status)
+
+
+_GRADE_DISTRIBUTION_DEFAULT = {"A": 0, "B": 0, "C": 0, "D": 0, "F": 0}
 
 
 def record_analysis_insights(analysis_result) -> None:
     """Learn from each contract analysis to build market intelligence."""
-    knowledge = load_knowledge()
-    mi = knowledge.setdefault("market_intelligence", {
-        "analyses_count": 0,
-        "grade_distribution": {"A": 0, "B": 0, "C": 0, "D": 0, "F": 0},
-        "common_risk_areas": [],
-        "pricing_observations": []
-    })
-
-    mi["analyses_count"] = mi.get("analyses_count", 0) + 1
-
-    grade = analysis_result.overall_grade
-    mi.setdefault("grade_distribution", {"A": 0, "B": 0, "C": 0, "D": 0, "F": 0})
-    if grade in mi["grade_distribution"]:
-        mi["grade_distribution"][grade] += 1
-
-    for risk in analysis_result.cost_risk_areas:
-        risk_areas = mi.setdefault("common_risk_areas", [])
-        existing = next((r for r in risk_areas if r["area"] == risk.area), None)
-        if existing:
-            existing["count"] = existing.get("count", 1) + 1
-        else:
-            risk_areas.append({"area": risk.area, "count": 1, "risk_level": risk.risk_level})
-
-    pricing_obs = mi.setdefault("pricing_observations", [])
-    pricing_obs.append({
-        "date": datetime.now(timezone.utc).date().isoformat(),
-        "brand_retail": analysis_result.pricing_terms.brand_retail_awp_discount,
-        "generic_retail": analysis_result.pricing_terms.generic_retail_awp_discount,
-        "specialty": analysis_result.pricing_terms.specialty_awp_discount,
-        "grade": grade,
-    })
-    if len(pricing_obs) > 100:
-        mi["pricing_observations"] = pricing_obs[-100:]
-
-    knowledge["market_intelligence"] = mi
-    save_knowledge(knowledge)
+    with knowledge_txn(include_curated=False) as knowledge:
+        mi = knowledge.get("market_intelligence")
+        if mi is None:
+            mi = knowledge["market_intelligence"] = {
+                "analyses_count": 0,
+                "risk_areas_map": {},
+                "pricing_observations": []
+            }
+
+        mi["analyses_count"] = mi.get("analyses_count", 0) + 1
+
+        grade = analysis_result.overall_grade
+        grade_dist = mi.get("grade_distribution")
+        if grade_dist is None:
+            grade_dist = mi["grade_distribution"] = dict(_GRADE_DISTRIBUTION_DEFAULT)
+        if grade in grade_dist:
+            grade_dist[grade] += 1
+
+        risk_map = _risk_areas_map(mi)
+        for risk in analysis_result.cost_risk_areas:
+            entry = risk_map.get(risk.area)
+            if entry:
+                entry["count"] = entry.get("count", 1) + 1
+            else:
+                risk_map[risk.area] = {"count": 1, "risk_level": risk.risk_level}
+
+        pricing_obs = mi.get("pricing_observations")
+        if pricing_obs is None:
+            pricing_obs = mi["pricing_observations"] = []
+        pricing_obs.append({
+            "date": datetime.now(timezone.utc).date().isoformat(),
+            "brand_retail": analysis_result.pricing_terms.brand_retail_awp_discount,
+            "generic_retail": analysis_result.pricing_terms.generic_retail_awp_discount,
+            "specialty": analysis_result.pricing_terms.specialty_awp_discount,
+            "grade": grade,
+        })
+        # Trim in place; the list stays at most 100 long so this drops one entry
+        del pricing_obs[:-100]
+
+        mi["_derived"] = _derive_market_summary(mi)
+        knowledge["market_intelligence"] = mi
+
+
+def _risk_areas_map(mi: dict) -> dict[str, dict]:
+    """Risk-area counts keyed by area, migrating the older common_risk_areas list in place."""
+    risk_map = mi.get("risk_areas_map")
+    if risk_map is None:
+        risk_map = mi["risk_areas_map"] = {}
+        for r in mi.pop("common_risk_areas", []):
+            if r["area"] not in risk_map:
+                risk_map[r["area"]] = {"count": r.get("count", 1), "risk_level": r.get("risk_level")}
+    return risk_map
+
+
+def _derive_market_summary(mi: dict) -> dict:
+    """Prompt-ready summary of market_intelligence, refreshed whenever it changes."""
+    grade_dist = mi.get("grade_distribution", {})
+    if "risk_areas_map" in mi:
+        risk_items = mi["risk_areas_map"].items()
+    else:
+        risk_items = ((r["area"], r) for r in mi.get("common_risk_areas", []))
+    common_risks = heapq.nlargest(5, risk_items, key=lambda item: item[1].get("count", 0))
+    return {
+        "total_grades": sum(grade_dist.values()),
+        "grade_str": ", ".join(f"{g}:{c}" for g, c in grade_dist.items() if c > 0),
+        "top_risks": [area for area, _ in common_risks],
+    }
+
+
+_FEDERAL_SEEN_MAX = 1000
+
+
+def _fingerprint(key: str) -> str:
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
 
 
 def fetch_federal_register_updates(knowledge: dict) -> list[str]:
@@ -1120,227 +1303,346 @@ def fetch_federal_register_updates(knowledge: dict) -> list[str]:
             "?per_page=5&order=newest"
             "&conditions[term]=pharmacy+benefit+manager"
             "&conditions[type][]=Rule&conditions[type][]=Proposed+Rule"
+            # Only the fields used below, instead of every document attribute
+            "&fields[]=title&fields[]=publication_date&fields[]=abstract&fields[]=html_url"
         )
-        resp = requests.get(url, timeout=15)
+        # Conditional GET: an unchanged feed comes back as an empty 304
+        validators = knowledge.get("federal_register_validators", {})
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        resp = _http.get(url, headers=headers, timeout=15)
+        if resp.status_code == 304:
+            return updates
         if resp.status_code == 200:
             data = resp.json()
             articles = data.get("results", [])
             new_items = []
-            existing_titles = {
-                item.get("title") for item in knowledge.get("recent_federal_updates", [])
-            }
+            # Fingerprints of every document seen so far are persisted, so rules
+            # that have aged out of recent_federal_updates are not re-added as new.
+            # Documents are keyed by URL, which survives title edits on re-issue;
+            # title fingerprints from older knowledge files still match too.
+            seen = knowledge.get("federal_seen")
+            if seen is None:
+                seen = knowledge.pop("federal_seen_titles", []) + [
+                    _fingerprint(item.get("url") or item.get("title", ""))
+                    for item in knowledge.get("recent_federal_updates", [])
+                ]
+            seen_set = set(seen)
             for article in articles:
                 title = article.get("title", "")
-                if title and title not in existing_titles:
+                url = article.get("html_url", "")
+                fingerprint = _fingerprint(url or title)
+                if title and fingerprint not in seen_set and _fingerprint(title) not in seen_set:
+                    seen_set.add(fingerprint)
+                    seen.append(fingerprint)
                     new_items.append({
                         "title": title,
                         "date": article.get("publication_date", ""),
                         "abstract": (article.get("abstract") or "")[:400],
-                        "url": article.get("html_url", ""),
+                        "url": url,
                         "source": "Federal Register",
                     })
                     updates.append(f"New federal rule: {title}")
 
-            all_items = new_items + knowledge.get("recent_federal_updates", [])
-            knowledge["recent_federal_updates"] = all_items[:20]
+            new_items.extend(knowledge.get("recent_federal_updates", []))
+            del new_items[20:]
+            knowledge["recent_federal_updates"] = new_items
+            knowledge["federal_seen"] = seen[-_FEDERAL_SEEN_MAX:]
+            # Stored last: if anything above raised, the next refresh must not
+            # get a 304 for articles that were never merged
+            knowledge["federal_register_validators"] = {
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+            }
     except Exception as e:
         print(f"[Knowledge] Federal Register fetch failed: {e}")
     return updates
 
 
+# Public-source fetchers run on every refresh. Each takes the knowledge dict,
+# updates its own section in place and returns human-readable update notes.
+_FETCHERS = (
+    fetch_federal_register_updates,
+)
+
+
 def update_knowledge_base() -> dict:
     """
     Fetch updates from public sources and refresh the knowledge base.
     Returns a summary of what was updated.
     """
     print("[Knowledge] Starting knowledge base update...")
-    knowledge = load_knowledge()
+    # Fetch without holding the lock, so analyses aren't blocked on the
+    # network. Each fetcher works on its own copy; only the sections they
+    # changed are merged back into the current knowledge afterwards.
+    original = load_knowledge(include_curated=False)
     all_updates = []
+    changes = {}
+    removed = set()
 
-    federal_updates = fetch_federal_register_updates(knowledge)
-    all_updates.extend(federal_updates)
+    # Sources are fetched concurrently so the refresh takes as long as the
+    # slowest one
+    with ThreadPoolExecutor(max_workers=len(_FETCHERS), thread_name_prefix="knowledge") as pool:
+        workspaces = [copy.deepcopy(original) for _ in _FETCHERS]
+        futures = [pool.submit(fetch, ws) for fetch, ws in zip(_FETCHERS, workspaces)]
+        for fetch, ws, future in zip(_FETCHERS, workspaces, futures):
+            try:
+                all_updates.extend(future.result())
+            except Exception as e:
+                print(f"[Knowledge] {fetch.__name__} failed: {e}")
+                continue
+            for key, value in ws.items():
+                if key not in original or original[key] != value:
+                    changes[key] = value
+            removed.update(key for key in original if key not in ws)
 
-    if all_updates:
-        update_record = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "updates": all_updates,
-        }
-        knowledge.setdefault("knowledge_updates", []).append(update_record)
-        if len(knowledge["knowledge_updates"]) > 50:
-            knowledge["knowledge_updates"] = knowledge["knowledge_updates"][-50:]
+    with knowledge_txn(include_curated=False) as knowledge:
+        for key in removed:
+            knowledge.pop(key, None)
+        knowledge.update(changes)
 
-    save_knowledge(knowledge)
+        if all_updates:
+            update_record = {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "updates": all_updates,
+            }
+            knowledge_updates = knowledge.get("knowledge_updates")
+            if knowledge_updates is None:
+                knowledge_updates = knowledge["knowledge_updates"] = []
+            knowledge_updates.append(update_record)
+            del knowledge_updates[:-50]
     print(f"[Knowledge] Update complete. {len(all_updates)} new items found.")
     return {"updates_found": len(all_updates), "details": all_updates}
 
 
-def format_knowledge_for_prompt(knowledge: dict) -> str:
+# (key, text) of the last rendered knowledge sections; see format_knowledge_for_prompt
+_prompt_cache: tuple = (None, "")
+
+
+def format_knowledge_for_prompt(knowledge: Mapping) -> str:
     """Format knowledge base into a concise string for inclusion in the system prompt."""
+    global _prompt_cache
+    # Only the library section needs rebuilding while the knowledge is unchanged
+    key = knowledge_version(knowledge)
+    cached_key, knowledge_text = _prompt_cache
+    if key != cached_key:
+        knowledge_text = _format_knowledge_sections(knowledge)
+        _prompt_cache = (key, knowledge_text)
+
+    sections = [knowledge_text] if knowledge_text else []
+    sections.extend(_format_library_section())
+    last_updated = knowledge.get("last_updated", "Unknown")
+    sections.append(f"\n[Knowledge base last updated: {last_updated}]")
+    return "\n".join(sections)
+
+
+def _format_knowledge_sections(knowledge: Mapping) -> str:
     sections = []
 
     benchmarks = knowledge.get("market_benchmarks", {})
-    if benchmarks:
-        b = benchmarks
-        sections.append("CURRENT MARKET BENCHMARKS (sourced from PSG, Segal, Milliman 2024 surveys):")
-        sections.append(f"  IMPORTANT: {b.get('_important_note', '')}")
-        sections.append(f"  GROUP SIZE NOTE: {b.get('_group_size_note', '')}")
-
-        bd = b.get("brand_drugs", {})
-        if bd:
-            r30 = bd.get("retail_30day", {})
-            sections.append("  Brand Retail (30-day):")
-            sections.append(f"    - Below market: {r30.get('below_market', 'N/A')}")
-            sections.append(f"    - At market: {r30.get('at_market', 'N/A')}")
-            sections.append(f"    - Favorable: {r30.get('favorable', 'N/A')}")
-            sections.append(f"    - Top of market: {r30.get('top_of_market', 'N/A')}")
-            mo = bd.get("mail_order_90day", {})
-            sections.append("  Brand Mail Order (90-day):")
-            sections.append(f"    - At market: {mo.get('at_market', 'N/A')}")
-            sections.append(f"    - Favorable: {mo.get('favorable', 'N/A')}")
-
-        gd = b.get("generic_drugs", {})
-        if gd:
-            gr = gd.get("retail_30day", {})
-            sections.append(f"  Generic Retail: {gd.get('_critical_note', '')}")
-            sections.append(f"    - Below market: {gr.get('below_market', 'N/A')}")
-            sections.append(f"    - At market: {gr.get('at_market', 'N/A')}")
-            sections.append(f"    - Favorable: {gr.get('favorable', 'N/A')}")
-            sections.append(f"    - MAC transparency standard: {gr.get('mac_transparency_standard', 'N/A')}")
-            gm = gd.get("mail_order_90day", {})
-            sections.append("  Generic Mail Order (90-day):")
-            sections.append(f"    - At market: {gm.get('at_market', 'N/A')}")
-            sections.append(f"    - Favorable: {gm.get('favorable', 'N/A')}")
-
-        sp = b.get("specialty_drugs", {})
-        if sp:
-            sections.append(f"  Specialty Drugs: {sp.get('_critical_note', '')}")
-            sa = sp.get("awp_discount", {})
-            sections.append("  Specialty AWP Discount:")
-            sections.append(f"    - Below market: {sa.get('below_market', 'N/A')}")
-            sections.append(f"    - At market: {sa.get('at_market', 'N/A')}")
-            sections.append(f"    - Favorable: {sa.get('favorable', 'N/A')}")
-            sections.append(f"    - Biosimilars: {sa.get('biosimilars', 'N/A')}")
-            sr = sp.get("specialty_rebates", {})
-            pmpm = sr.get("brand_specialty_rebates_pmpm", {})
-            sections.append(f"  Specialty Rebates (PMPM): NOTE — {sr.get('_note', '')}")
-            sections.append(f"    - Below market: {pmpm.get('below_market', 'N/A')}")
-            sections.append(f"    - At market: {pmpm.get('at_market', 'N/A')}")
-            sections.append(f"    - Favorable: {pmpm.get('favorable', 'N/A')}")
-            sections.append(f"    - High-rebate drug classes: {', '.join(pmpm.get('key_classes_with_high_rebates', []))}")
-            sections.append(f"    - Low/no rebate classes: {', '.join(pmpm.get('key_classes_with_low_rebates', []))}")
-            ret = sr.get("retention_model", {})
-            sections.append("  Specialty Rebate Retention:")
-            sections.append(f"    - Below market: {ret.get('below_market', 'N/A')}")
-            sections.append(f"    - Favorable: {ret.get('favorable', 'N/A')}")
-            exc = sr.get("specialty_pharmacy_exclusivity", {})
-            sections.append("  Specialty Pharmacy Exclusivity:")
-            sections.append(f"    - Below market: {exc.get('below_market', 'N/A')}")
-            sections.append(f"    - Favorable: {exc.get('favorable', 'N/A')}")
-
-        df = b.get("dispensing_fees", {})
-        if df:
-            sections.append("  Dispensing Fees:")
-            sections.append(f"    - Retail per claim: below market={df.get('retail_per_claim', {}).get('below_market','N/A')}, favorable={df.get('retail_per_claim', {}).get('favorable','N/A')}")
-            sections.append(f"    - Mail order per fill: top of market={df.get('mail_order_per_fill', {}).get('top_of_market','N/A')}")
-
-        rb = b.get("rebates_brand_drugs", {})
-        if rb:
-            psz = rb.get("pmpy_guarantee_by_group_size", {})
-            sections.append("  Brand Rebate Guarantees (PMPY — per member per year):")
-            sections.append(f"    - Small groups (<500 lives): at market={psz.get('small_under_500_lives',{}).get('at_market','N/A')}, favorable={psz.get('small_under_500_lives',{}).get('favorable','N/A')}")
-            sections.append(f"    - Mid groups (500-5k lives): at market={psz.get('mid_500_to_5000_lives',{}).get('at_market','N/A')}, favorable={psz.get('mid_500_to_5000_lives',{}).get('favorable','N/A')}")
-            sections.append(f"    - Large groups (5k-25k lives): at market={psz.get('large_5000_to_25000_lives',{}).get('at_market','N/A')}, favorable={psz.get('large_5000_to_25000_lives',{}).get('favorable','N/A')}")
-            pt = rb.get("passthrough_vs_retention", {})
-            sections.append(f"    - Pass-through (best): {pt.get('top_of_market','N/A')}")
-            sections.append(f"    - Below market retention: {pt.get('below_market','N/A')}")
-
-        af = b.get("administrative_fees", {})
-        if af:
-            pm = af.get("pmpm_total", {})
-            sections.append("  Administrative Fees (PMPM total):")
-            sections.append(f"    - Below market: {pm.get('below_market','N/A')}")
-            sections.append(f"    - At market: {pm.get('at_market','N/A')}")
-            sections.append(f"    - Favorable: {pm.get('favorable','N/A')}")
-            sections.append(f"    - Note: {pm.get('notes','')}")
-
-        ar = b.get("audit_rights", {})
-        if ar:
-            sections.append("  Audit Rights:")
-            sections.append(f"    - Below market: {ar.get('below_market','N/A')}")
-            sections.append(f"    - Favorable: {ar.get('favorable','N/A')}")
-
-        conf = b.get("benchmark_confidence", {})
-        if conf:
-            sections.append("  Benchmark confidence levels:")
-            sections.append(f"    - High confidence: {', '.join(conf.get('high_confidence',[]))}")
-            sections.append(f"    - Lower confidence (flag uncertainty): {', '.join(conf.get('lower_confidence',[]))}")
+    if benchmarks is _CURATED_BENCHMARKS:
+        sections.append(_CURATED_BENCHMARKS_PROMPT)
+    elif benchmarks:
+        sections.extend(_format_benchmarks(benchmarks))
 
     legislation = knowledge.get("legislation", [])
     if legislation:
         sections.append("\nKEY LEGISLATION AND REGULATORY DEVELOPMENTS:")
-        for law in legislation[-6:]:
-            sections.append(f"  - {law.get('title', '')} ({law.get('year', '')}): {law.get('key_provisions', '')[:200]}")
+        sections.extend(
+            f"  - {law.get('title', '')} ({law.get('year', '')}): {law.get('key_provisions', '')[:200]}"
+            for law in legislation[-6:]
+        )
 
     recent_fed = knowledge.get("recent_federal_updates", [])
     if recent_fed:
         sections.append("\nRECENT FEDERAL REGISTER UPDATES (PBM-related):")
-        for item in recent_fed[:3]:
-            sections.append(f"  - [{item.get('date', '')}] {item.get('title', '')}")
+        sections.extend(f"  - [{item.get('date', '')}] {item.get('title', '')}" for item in recent_fed[:3])
 
     trends = knowledge.get("industry_trends", [])
     if trends:
         sections.append("\nCURRENT INDUSTRY TRENDS:")
-        for trend in trends[:6]:
-            sections.append(f"  - {trend}")
+        sections.extend(f"  - {trend}" for trend in trends[:6])
+
+    if all(knowledge.get(key) is _ALWAYS_OVERLAID[key] for key in _CURATED_PROGRAM_KEYS):
+        if _CURATED_PROGRAMS_PROMPT:
+            sections.append(_CURATED_PROGRAMS_PROMPT)
+    else:
+        sections.extend(_format_market_programs(knowledge))
+
+    mi = knowledge.get("market_intelligence", {})
+    if mi.get("analyses_count", 0) > 0:
+        sections.append(f"\nMARKET INTELLIGENCE (from {mi['analyses_count']} analyzed contracts):")
+        derived = mi.get("_derived") or _derive_market_summary(mi)
+        if derived["total_grades"] > 0:
+            sections.append(f"  - Grade distribution: {derived['grade_str']}")
+        if derived["top_risks"]:
+            sections.append(f"  - Most common risk areas: {', '.join(derived['top_risks'])}")
+
+    return "\n".join(sections)
+
+
+def _format_benchmarks(b: dict) -> list[str]:
+    sections = []
+    sections.append("CURRENT MARKET BENCHMARKS (sourced from PSG, Segal, Milliman 2024 surveys):")
+    sections.append(f"  IMPORTANT: {b.get('_important_note', '')}")
+    sections.append(f"  GROUP SIZE NOTE: {b.get('_group_size_note', '')}")
+
+    bd = b.get("brand_drugs", {})
+    if bd:
+        r30 = bd.get("retail_30day", {})
+        sections.append("  Brand Retail (30-day):")
+        sections.append(f"    - Below market: {r30.get('below_market', 'N/A')}")
+        sections.append(f"    - At market: {r30.get('at_market', 'N/A')}")
+        sections.append(f"    - Favorable: {r30.get('favorable', 'N/A')}")
+        sections.append(f"    - Top of market: {r30.get('top_of_market', 'N/A')}")
+        mo = bd.get("mail_order_90day", {})
+        sections.append("  Brand Mail Order (90-day):")
+        sections.append(f"    - At market: {mo.get('at_market', 'N/A')}")
+        sections.append(f"    - Favorable: {mo.get('favorable', 'N/A')}")
+
+    gd = b.get("generic_drugs", {})
+    if gd:
+        gr = gd.get("retail_30day", {})
+        sections.append(f"  Generic Retail: {gd.get('_critical_note', '')}")
+        sections.append(f"    - Below market: {gr.get('below_market', 'N/A')}")
+        sections.append(f"    - At market: {gr.get('at_market', 'N/A')}")
+        sections.append(f"    - Favorable: {gr.get('favorable', 'N/A')}")
+        sections.append(f"    - MAC transparency standard: {gr.get('mac_transparency_standard', 'N/A')}")
+        gm = gd.get("mail_order_90day", {})
+        sections.append("  Generic Mail Order (90-day):")
+        sections.append(f"    - At market: {gm.get('at_market', 'N/A')}")
+        sections.append(f"    - Favorable: {gm.get('favorable', 'N/A')}")
+
+    sp = b.get("specialty_drugs", {})
+    if sp:
+        sections.append(f"  Specialty Drugs: {sp.get('_critical_note', '')}")
+        sa = sp.get("awp_discount", {})
+        sections.append("  Specialty AWP Discount:")
+        sections.append(f"    - Below market: {sa.get('below_market', 'N/A')}")
+        sections.append(f"    - At market: {sa.get('at_market', 'N/A')}")
+        sections.append(f"    - Favorable: {sa.get('favorable', 'N/A')}")
+        sections.append(f"    - Biosimilars: {sa.get('biosimilars', 'N/A')}")
+        sr = sp.get("specialty_rebates", {})
+        pmpm = sr.get("brand_specialty_rebates_pmpm", {})
+        sections.append(f"  Specialty Rebates (PMPM): NOTE — {sr.get('_note', '')}")
+        sections.append(f"    - Below market: {pmpm.get('below_market', 'N/A')}")
+        sections.append(f"    - At market: {pmpm.get('at_market', 'N/A')}")
+        sections.append(f"    - Favorable: {pmpm.get('favorable', 'N/A')}")
+        sections.append(f"    - High-rebate drug classes: {', '.join(pmpm.get('key_classes_with_high_rebates', []))}")
+        sections.append(f"    - Low/no rebate classes: {', '.join(pmpm.get('key_classes_with_low_rebates', []))}")
+        ret = sr.get("retention_model", {})
+        sections.append("  Specialty Rebate Retention:")
+        sections.append(f"    - Below market: {ret.get('below_market', 'N/A')}")
+        sections.append(f"    - Favorable: {ret.get('favorable', 'N/A')}")
+        exc = sr.get("specialty_pharmacy_exclusivity", {})
+        sections.append("  Specialty Pharmacy Exclusivity:")
+        sections.append(f"    - Below market: {exc.get('below_market', 'N/A')}")
+        sections.append(f"    - Favorable: {exc.get('favorable', 'N/A')}")
 
+    df = b.get("dispensing_fees", {})
+    if df:
+        sections.append("  Dispensing Fees:")
+        sections.append(f"    - Retail per claim: below market={df.get('retail_per_claim', {}).get('below_market','N/A')}, favorable={df.get('retail_per_claim', {}).get('favorable','N/A')}")
+        sections.append(f"    - Mail order per fill: top of market={df.get('mail_order_per_fill', {}).get('top_of_market','N/A')}")
+
+    rb = b.get("rebates_brand_drugs", {})
+    if rb:
+        psz = rb.get("pmpy_guarantee_by_group_size", {})
+        sections.append("  Brand Rebate Guarantees (PMPY — per member per year):")
+        sections.append(f"    - Small groups (<500 lives): at market={psz.get('small_under_500_lives',{}).get('at_market','N/A')}, favorable={psz.get('small_under_500_lives',{}).get('favorable','N/A')}")
+        sections.append(f"    - Mid groups (500-5k lives): at market={psz.get('mid_500_to_5000_lives',{}).get('at_market','N/A')}, favorable={psz.get('mid_500_to_5000_lives',{}).get('favorable','N/A')}")
+        sections.append(f"    - Large groups (5k-25k lives): at market={psz.get('large_5000_to_25000_lives',{}).get('at_market','N/A')}, favorable={psz.get('large_5000_to_25000_lives',{}).get('favorable','N/A')}")
+        pt = rb.get("passthrough_vs_retention", {})
+        sections.append(f"    - Pass-through (best): {pt.get('top_of_market','N/A')}")
+        sections.append(f"    - Below market retention: {pt.get('below_market','N/A')}")
+
+    af = b.get("administrative_fees", {})
+    if af:
+        pm = af.get("pmpm_total", {})
+        sections.append("  Administrative Fees (PMPM total):")
+        sections.append(f"    - Below market: {pm.get('below_market','N/A')}")
+        sections.append(f"    - At market: {pm.get('at_market','N/A')}")
+        sections.append(f"    - Favorable: {pm.get('favorable','N/A')}")
+        sections.append(f"    - Note: {pm.get('notes','')}")
+
+    ar = b.get("audit_rights", {})
+    if ar:
+        sections.append("  Audit Rights:")
+        sections.append(f"    - Below market: {ar.get('below_market','N/A')}")
+        sections.append(f"    - Favorable: {ar.get('favorable','N/A')}")
+
+    conf = b.get("benchmark_confidence", {})
+    if conf:
+        sections.append("  Benchmark confidence levels:")
+        sections.append(f"    - High confidence: {', '.join(conf.get('high_confidence',[]))}")
+        sections.append(f"    - Lower confidence (flag uncertainty): {', '.join(conf.get('lower_confidence',[]))}")
+    return sections
+
+
+# The curated benchmarks are static, so their prompt block is rendered once
+_CURATED_BENCHMARKS_PROMPT = "\n".join(_format_benchmarks(_CURATED_BENCHMARKS))
+
+
+_CURATED_PROGRAM_KEYS = (
+    "biosimilar_opportunities",
+    "patent_cliff_generics",
+    "alternative_pharmacy_programs",
+    "manufacturer_coupon_provisions",
+)
+
+
+def _format_market_programs(knowledge: Mapping) -> list[str]:
+    sections = []
     biosimilars = knowledge.get("biosimilar_opportunities", [])
     if biosimilars:
         sections.append("\nBIOSIMILAR OPPORTUNITIES (use for savings_opportunities):")
-        for b in biosimilars:
-            sections.append(f"  - {b['drug_name']}: {b['biosimilar_name']} | Status: {b['fda_status']} | Savings: {b['typical_savings_pct']}")
-            sections.append(f"    Action: {b['action_for_employer'][:200]}")
+        sections.extend(
+            f"  - {b['drug_name']}: {b['biosimilar_name']} | Status: {b['fda_status']} | Savings: {b['typical_savings_pct']}\n"
+            f"    Action: {b['action_for_employer'][:200]}"
+            for b in biosimilars
+        )
 
     patent_cliffs = knowledge.get("patent_cliff_generics", [])
     if patent_cliffs:
         sections.append("\nPATENT CLIFF / UPCOMING GENERICS (use for savings_opportunities):")
-        for p in patent_cliffs:
-            sections.append(f"  - {p['brand_name']} ({p['generic_name']}): Generic entry {p['patent_expiry_year']} | Condition: {p['high_volume_condition']}")
-            sections.append(f"    Action: {p['action_for_employer'][:200]}")
+        sections.extend(
+            f"  - {p['brand_name']} ({p['generic_name']}): Generic entry {p['patent_expiry_year']} | Condition: {p['high_volume_condition']}\n"
+            f"    Action: {p['action_for_employer'][:200]}"
+            for p in patent_cliffs
+        )
 
     alt_programs = knowledge.get("alternative_pharmacy_programs", [])
     if alt_programs:
         sections.append("\nALTERNATIVE PHARMACY PROGRAMS (use for savings_opportunities when contract shows weak generic pricing or spread):")
-        for a in alt_programs:
-            sections.append(f"  - {a['program_name']}: {a['description'][:200]}")
-            sections.append(f"    Best for: {a['best_for'][:150]}")
-            sections.append(f"    Contract consideration: {a['contract_considerations'][:200]}")
+        sections.extend(
+            f"  - {a['program_name']}: {a['description'][:200]}\n"
+            f"    Best for: {a['best_for'][:150]}\n"
+            f"    Contract consideration: {a['contract_considerations'][:200]}"
+            for a in alt_programs
+        )
 
     coupon_provisions = knowledge.get("manufacturer_coupon_provisions", [])
     if coupon_provisions:
         sections.append("\nMANUFACTURER COUPON / ACCUMULATOR PROVISIONS (use for savings_opportunities when accumulator/coupon language found):")
-        for c in coupon_provisions:
-            sections.append(f"  - {c['provision_name']}: {c['description'][:200]}")
-            sections.append(f"    Contract risk: {c['risk_to_employer'][:150]}")
-            sections.append(f"    Negotiation target: {c['negotiation_target'][:200]}")
+        sections.extend(
+            f"  - {c['provision_name']}: {c['description'][:200]}\n"
+            f"    Contract risk: {c['risk_to_employer'][:150]}\n"
+            f"    Negotiation target: {c['negotiation_target'][:200]}"
+            for c in coupon_provisions
+        )
+    return sections
 
-    mi = knowledge.get("market_intelligence", {})
-    if mi.get("analyses_count", 0) > 0:
-        sections.append(f"\nMARKET INTELLIGENCE (from {mi['analyses_count']} analyzed contracts):")
-        grade_dist = mi.get("grade_distribution", {})
-        total = sum(grade_dist.values())
-        if total > 0:
-            grade_str = ", ".join(f"{g}:{c}" for g, c in grade_dist.items() if c > 0)
-            sections.append(f"  - Grade distribution: {grade_str}")
-        common_risks = sorted(
-            mi.get("common_risk_areas", []),
-            key=lambda x: x.get("count", 0),
-            reverse=True
-        )[:5]
-        if common_risks:
-            risk_str = ", ".join(r["area"] for r in common_risks)
-            sections.append(f"  - Most common risk areas: {risk_str}")
-
-    # Contract library benchmarks (only when ≥3 contracts analyzed)
+
+# Like the benchmarks, the curated savings programs only change on deploy
+_CURATED_PROGRAMS_PROMPT = "\n".join(_format_market_programs(_ALWAYS_OVERLAID))
+
+
+def _format_library_section() -> list[str]:
+    """Contract library benchmarks (only when ≥3 contracts analyzed)."""
+    sections = []
     try:
         from .leads import get_library_benchmarks
         lib = get_library_benchmarks()
@@ -1361,30 +1663,30 @@ def format_knowledge_for_prompt(knowledge: dict) -> str:
             )
     except Exception as e:
         print(f"[Knowledge] Could not load contract library: {e}")
+    return sections
 
-    last_updated = knowledge.get("last_updated", "Unknown")
-    sections.append(f"\n[Knowledge base last updated: {last_updated}]")
 
-    return "\n".join(sections)
+UPDATE_INTERVAL_SECONDS = 24 * 3600
 
 
-def periodic_update_worker():
-    """Background thread that updates knowledge every 24 hours."""
-    # Run immediately on startup, then every 24 hours
-    try:
-        update_knowledge_base()
-    except Exception as e:
-        print(f"[Knowledge] Initial update error: {e}")
+async def periodic_update_loop():
+    """Refresh the knowledge base on startup, then every 24 hours."""
+    loop = asyncio.get_running_loop()
+    # Runs are scheduled against fixed monotonic deadlines so the time spent
+    # updating doesn't push each subsequent run later
+    deadline = loop.time()
     while True:
-        time.sleep(24 * 3600)
         try:
-            update_knowledge_base()
+            # Fetches block on the network, so they run on the default executor
+            await loop.run_in_executor(None, update_knowledge_base)
         except Exception as e:
             print(f"[Knowledge] Periodic update error: {e}")
+        deadline += UPDATE_INTERVAL_SECONDS
+        await asyncio.sleep(max(0.0, deadline - loop.time()))
 
 
-def start_background_updater():
-    """Start the background knowledge update thread."""
-    thread = threading.Thread(target=periodic_update_worker, daemon=True)
-    thread.start()
-    print("[Knowledge] Background updater started (updates every 24 hours, first run in 1 hour)")
+def start_background_updater() -> asyncio.Task:
+    """Schedule the periodic knowledge update on the running event loop."""
+    task = asyncio.get_running_loop().create_task(periodic_update_loop())
+    print("[Knowledge] Background updater started (updates now, then every 24 hours)")
+    return task
@@ -4,15 +4,25 @@ Saves contact info + analysis grade to a local SQLite database.
 Optionally sends an email notification via SMTP on each new lead.
 """
 
+import atexit
 import csv
 import io
 import json
 import logging
 import os
+import queue
 import re
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional
+from pathlib import Path
+from typing import Iterator, Optional
+
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
 
 from .models import ContactInfo, PBMAnalysisReport
 
@@ -22,6 +32,100 @@ _DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(__file__), ".."))
 DB_PATH = os.path.join(_DATA_DIR, "leads.db")
 
 
+# ── Connections ───────────────────────────────────────────────────────────────
+# A single writer (SQLite only ever admits one) plus a pool of read-only
+# connections, so library/export reads never queue behind save_lead/save_contract.
+
+_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+)
+
+
+def connect_db(readonly: bool = False) -> sqlite3.Connection:
+    """Open a leads.db connection with the shared WAL/PRAGMA settings."""
+    if readonly:
+        uri = f"{Path(DB_PATH).resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+    else:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA wal_autocheckpoint=1000")
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+class _ConnectionPool:
+    """Lazily opened pool of up to `size` connections, checked out one thread at a time."""
+
+    def __init__(self, size: int, readonly: bool):
+        self._size = size
+        self._readonly = readonly
+        self._opened = 0
+        self._idle: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self._size:
+                conn = connect_db(self._readonly)
+                self._opened += 1
+                return conn
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+
+_writers = _ConnectionPool(1, readonly=False)
+_readers = _ConnectionPool(os.cpu_count() or 4, readonly=True)
+
+
+@contextmanager
+def _writer():
+    """Check out the writer and run the block inside a BEGIN IMMEDIATE transaction."""
+    with _writers.connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+def _reader():
+    """Check out a read-only connection (rows come back as sqlite3.Row)."""
+    return _readers.connection()
+
+
+def optimize_db():
+    """Let SQLite refresh query-planner statistics for tables whose usage has
+    changed. Cheap when nothing is stale, so it can run on a timer and at shutdown."""
+    with _writers.connection() as conn:
+        conn.execute("PRAGMA optimize")
+
+
+def checkpoint_db():
+    """Copy the WAL back into leads.db and truncate it, so a long-running
+    process doesn't leave readers scanning an ever-longer WAL."""
+    with _writers.connection() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
 # ── Database setup ────────────────────────────────────────────────────────────
 
 def init_db():
@@ -64,6 +168,79 @@ def init_db():
         except sqlite3.OperationalError:
             pass  # Column already exists
 
+        # Migration: numeric pricing columns and per-contract concern/risk rows,
+        # parsed once in save_contract so the library stats aggregate in SQL
+        for column in _CONTRACT_NUMERIC_COLUMNS:
+            try:
+                conn.execute(f"ALTER TABLE contracts ADD COLUMN {column} REAL")
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS contract_concerns (
+                session_id  TEXT    NOT NULL,
+                position    INTEGER NOT NULL,
+                concern     TEXT    NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_contract_concerns_session ON contract_concerns (session_id)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS contract_risks (
+                session_id  TEXT    NOT NULL,
+                position    INTEGER NOT NULL,
+                risk_level  TEXT    NOT NULL,
+                area        TEXT    NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_contract_risks_session ON contract_risks (session_id)")
+
+        # Contract text lives in its own table so scans and lookups on
+        # contracts never page in the full document
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS contract_texts (
+                session_id     TEXT PRIMARY KEY,
+                contract_text  TEXT NOT NULL
+            )
+        """)
+
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            _backfill_contract_stats(conn)
+        if version < 2:
+            _move_contract_texts(conn)
+        if version < _SCHEMA_VERSION:
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+        # Indexes for the hot reads: newest-first listing and export skip the
+        # sort, and the library averages scan a narrow covering index instead
+        # of rows carrying the full contract text and analysis JSON
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_leads_submitted ON leads (submitted_at DESC)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_contracts_uploaded ON contracts (uploaded_at DESC)")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_contracts_numeric ON contracts "
+            f"({', '.join(_CONTRACT_NUMERIC_COLUMNS)})"
+        )
+
+        # Cache of analysis results keyed by contract text + analysis schema
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS analysis_cache (
+                text_hash    TEXT NOT NULL,
+                schema_hash  TEXT NOT NULL,
+                result_json  TEXT NOT NULL,
+                created_at   REAL NOT NULL,
+                PRIMARY KEY (text_hash, schema_hash)
+            )
+        """)
+
+        # Single-row counter bumped by every contracts write, so each worker
+        # process can tell when the library changed without watching the file
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS library_meta (
+                id                 INTEGER PRIMARY KEY CHECK (id = 1),
+                contracts_version  INTEGER NOT NULL
+            )
+        """)
+        conn.execute("INSERT OR IGNORE INTO library_meta (id, contracts_version) VALUES (1, 0)")
+
         # Broker profile table (single-row, upsert on save)
         conn.execute("""
             CREATE TABLE IF NOT EXISTS broker_profile (
@@ -77,80 +254,86 @@ def init_db():
             )
         """)
         conn.commit()
+        # Planner statistics so the indexes above are picked up from the start
+        conn.execute("ANALYZE")
 
-    # Initialize auth users table
+    # Initialize auth users and analysis sessions tables
     from .auth import init_users_table
+    from .sessions import init_sessions_table
     init_users_table()
+    init_sessions_table()
 
 
 # ── Save a lead ───────────────────────────────────────────────────────────────
 
 def save_lead(contact: ContactInfo, analysis: PBMAnalysisReport, session_id: str):
     """
-    Write a lead to SQLite, then attempt to send an email notification.
-    Email errors are swallowed so they never break the HTTP response.
+    Write a lead to SQLite, then queue an email notification.
+    Email errors are logged by the mail worker so they never break the HTTP response.
     """
-    submitted_at = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute(
+    # The timestamp comes from SQLite (UTC, same "YYYY-MM-DD HH:MM:SS" format)
+    with _writer() as conn:
+        submitted_at = conn.execute(
             """
             INSERT INTO leads
               (submitted_at, first_name, last_name, email, phone, company,
                overall_grade, key_concerns, session_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (CURRENT_TIMESTAMP, ?, ?, ?, ?, ?, ?, ?, ?)
+            RETURNING submitted_at
             """,
             (
-                submitted_at,
                 contact.first_name,
                 contact.last_name,
                 contact.email,
                 contact.phone,
                 contact.company,
                 analysis.overall_grade,
-                json.dumps(analysis.key_concerns),
+                orjson.dumps(analysis.key_concerns).decode(),
                 session_id,
             ),
-        )
-        conn.commit()
+        ).fetchone()[0]
 
-    # Email notification — log errors but don't break the HTTP response
+    # Email notification is handed to the mail worker so the caller only waits on the insert
+    _ensure_email_worker()
     try:
-        _send_notification(contact, analysis, submitted_at)
-    except Exception as exc:
-        logging.getLogger(__name__).error("Email notification failed: %s", exc, exc_info=True)
+        _email_queue.put_nowait((contact, analysis, submitted_at))
+    except queue.Full:
+        logging.getLogger(__name__).error("Email notification dropped: queue full")
 
 
 # ── Email notification ────────────────────────────────────────────────────────
 
-def _send_notification(contact: ContactInfo, analysis: PBMAnalysisReport,
-                       submitted_at: str):
-    """
-    Send an HTML email via Resend API (HTTPS — works on Railway).
-    Required env vars: RESEND_API_KEY, NOTIFY_EMAIL
-    Optional:          NOTIFY_FROM (default: onboarding@resend.dev for testing,
-                       or your verified domain sender)
-    """
-    import requests as _requests
+# Pending (contact, analysis, submitted_at) notifications, sent one at a time
+# by a daemon thread started on the first lead
+_email_queue: "queue.Queue[tuple]" = queue.Queue(maxsize=1000)
+_email_worker: Optional[threading.Thread] = None
+_email_worker_lock = threading.Lock()
 
-    api_key      = os.getenv("RESEND_API_KEY", "").strip()
-    notify_email = os.getenv("NOTIFY_EMAIL", "").strip()
-    from_address = os.getenv("NOTIFY_FROM", "PBM Analyzer <onboarding@resend.dev>")
 
-    if not (api_key and notify_email):
-        return  # Not configured — skip silently
+def _ensure_email_worker():
+    global _email_worker
+    with _email_worker_lock:
+        if _email_worker is None:
+            _email_worker = threading.Thread(target=_email_worker_loop, name="lead-email", daemon=True)
+            _email_worker.start()
 
-    grade_color = {
-        "A": "#16a34a", "B": "#1d4ed8", "C": "#d97706",
-        "D": "#ea580c", "F": "#dc2626",
-    }.get(analysis.overall_grade, "#1e3a5f")
 
-    concerns_html = "".join(
-        f'<li style="margin-bottom:4px;">{c}</li>'
-        for c in analysis.key_concerns[:5]
-    )
+def _email_worker_loop():
+    while True:
+        contact, analysis, submitted_at = _email_queue.get()
+        # Log errors but keep the worker alive for the next lead
+        try:
+            _send_notification(contact, analysis, submitted_at)
+        except Exception as exc:
+            logging.getLogger(__name__).error("Email notification failed: %s", exc, exc_info=True)
+
+# Shared by lead notifications and password-reset mail so consecutive sends
+# reuse a pooled keep-alive connection to Resend instead of a new TLS handshake
+resend_http = requests.Session()
+resend_http.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+atexit.register(resend_http.close)
 
-    body_html = f"""
+_EMAIL_TEMPLATE = """
     <div style="font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',sans-serif;
                 max-width:580px;margin:0 auto;">
       <div style="background:#1e3a5f;padding:20px 28px;border-radius:8px 8px 0 0;">
@@ -164,27 +347,27 @@ def _send_notification(contact: ContactInfo, analysis: PBMAnalysisReport,
           <tr>
             <td style="padding:8px 12px;font-weight:600;color:#64748b;width:130px;">Name</td>
             <td style="padding:8px 12px;color:#0f172a;">
-              {contact.first_name} {contact.last_name}
+              {first_name} {last_name}
             </td>
           </tr>
           <tr style="background:#f8fafc;">
             <td style="padding:8px 12px;font-weight:600;color:#64748b;">Company</td>
-            <td style="padding:8px 12px;color:#0f172a;">{contact.company}</td>
+            <td style="padding:8px 12px;color:#0f172a;">{company}</td>
           </tr>
           <tr>
             <td style="padding:8px 12px;font-weight:600;color:#64748b;">Email</td>
             <td style="padding:8px 12px;">
-              <a href="mailto:{contact.email}" style="color:#1d4ed8;">{contact.email}</a>
+              <a href="mailto:{email}" style="color:#1d4ed8;">{email}</a>
             </td>
           </tr>
           <tr style="background:#f8fafc;">
             <td style="padding:8px 12px;font-weight:600;color:#64748b;">Phone</td>
-            <td style="padding:8px 12px;color:#0f172a;">{contact.phone}</td>
+            <td style="padding:8px 12px;color:#0f172a;">{phone}</td>
           </tr>
           <tr>
             <td style="padding:8px 12px;font-weight:600;color:#64748b;">Grade</td>
             <td style="padding:8px 12px;font-weight:800;font-size:18px;
-                       color:{grade_color};">{analysis.overall_grade}</td>
+                       color:{grade_color};">{grade}</td>
           </tr>
           <tr style="background:#f8fafc;">
             <td style="padding:8px 12px;font-weight:600;color:#64748b;">Submitted</td>
@@ -209,7 +392,45 @@ def _send_notification(contact: ContactInfo, analysis: PBMAnalysisReport,
     </div>
     """
 
-    resp = _requests.post(
+
+def _send_notification(contact: ContactInfo, analysis: PBMAnalysisReport,
+                       submitted_at: str):
+    """
+    Send an HTML email via Resend API (HTTPS — works on Railway).
+    Required env vars: RESEND_API_KEY, NOTIFY_EMAIL
+    Optional:          NOTIFY_FROM (default: onboarding@resend.dev for testing,
+                       or your verified domain sender)
+    """
+    api_key      = os.getenv("RESEND_API_KEY", "").strip()
+    notify_email = os.getenv("NOTIFY_EMAIL", "").strip()
+    from_address = os.getenv("NOTIFY_FROM", "PBM Analyzer <onboarding@resend.dev>")
+
+    if not (api_key and notify_email):
+        return  # Not configured — skip silently
+
+    grade_color = {
+        "A": "#16a34a", "B": "#1d4ed8", "C": "#d97706",
+        "D": "#ea580c", "F": "#dc2626",
+    }.get(analysis.overall_grade, "#1e3a5f")
+
+    concerns_html = "".join(
+        f'<li style="margin-bottom:4px;">{c}</li>'
+        for c in analysis.key_concerns[:5]
+    )
+
+    body_html = _EMAIL_TEMPLATE.format_map({
+        "first_name": contact.first_name,
+        "last_name": contact.last_name,
+        "company": contact.company,
+        "email": contact.email,
+        "phone": contact.phone,
+        "grade": analysis.overall_grade,
+        "grade_color": grade_color,
+        "submitted_at": submitted_at,
+        "concerns_html": concerns_html,
+    })
+
+    resp = resend_http.post(
         "https://api.resend.com/emails",
         headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
         json={
@@ -226,32 +447,131 @@ def _send_notification(contact: ContactInfo, analysis: PBMAnalysisReport,
 
 # ── Contract Library ──────────────────────────────────────────────────────────
 
+_PCT_RE = re.compile(r'(\d+(?:\.\d+)?)\s*%')
+_DOLLAR_RE = re.compile(r'\$\s*(\d+(?:\.\d+)?)')
+
+
 def _parse_pct(s: str) -> Optional[float]:
     """Extract the first numeric percentage value from a pricing string, or None."""
-    if not s or s.lower().startswith("not"):
+    if not s or s[:3].lower() == "not":
         return None
-    m = re.search(r'(\d+(?:\.\d+)?)\s*%', s)
+    m = _PCT_RE.search(s)
     return float(m.group(1)) if m else None
 
 
+_CONTRACT_NUMERIC_COLUMNS = (
+    "brand_retail_pct", "generic_retail_pct", "specialty_pct",
+    "brand_mail_pct", "generic_mail_pct",
+    "dispensing_fee_usd", "admin_fee_usd", "rebate_guarantee_usd",
+)
+_RISK_LEVELS = ("high", "medium", "low")
+
+# PRAGMA user_version of the current layout; init_db runs each backfill step once
+_SCHEMA_VERSION = 2
+
+# Ties in the top-N lists go to whichever value appeared first, in contract
+# then list order, as they did when the counts were accumulated in Python
+_FIRST_SEEN = "MIN(c.id * 65536 + t.position)"
+
+
+def _contract_numbers(pt: dict) -> tuple:
+    """Numeric forms of a contract's pricing terms, in _CONTRACT_NUMERIC_COLUMNS order."""
+    return (
+        _parse_pct(pt.get("brand_retail_awp_discount") or ""),
+        _parse_pct(pt.get("generic_retail_awp_discount") or ""),
+        _parse_pct(pt.get("specialty_awp_discount") or ""),
+        _parse_pct(pt.get("brand_mail_awp_discount") or ""),
+        _parse_pct(pt.get("generic_mail_awp_discount") or ""),
+        _parse_dollar(pt.get("retail_dispensing_fee") or ""),
+        _parse_dollar(pt.get("admin_fees") or ""),
+        _parse_dollar(pt.get("rebate_guarantee") or ""),
+    )
+
+
+def _index_concerns(conn: sqlite3.Connection, session_id: str, concerns: list):
+    conn.execute("DELETE FROM contract_concerns WHERE session_id = ?", (session_id,))
+    conn.executemany(
+        "INSERT INTO contract_concerns (session_id, position, concern) VALUES (?, ?, ?)",
+        [(session_id, i, c) for i, c in enumerate(concerns) if isinstance(c, str)],
+    )
+
+
+def _index_risks(conn: sqlite3.Connection, session_id: str, risk_items: list):
+    conn.execute("DELETE FROM contract_risks WHERE session_id = ?", (session_id,))
+    rows = []
+    for i, item in enumerate(risk_items):
+        level = (item.get("risk_level") or "").lower()
+        if level in _RISK_LEVELS:
+            rows.append((session_id, i, level, item.get("area") or ""))
+    conn.executemany(
+        "INSERT INTO contract_risks (session_id, position, risk_level, area) VALUES (?, ?, ?, ?)",
+        rows,
+    )
+
+
+def _backfill_contract_stats(conn: sqlite3.Connection):
+    """Fill the numeric columns and concern/risk rows for contracts saved before they existed."""
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute(
+        "SELECT session_id, brand_retail, generic_retail, specialty, retail_dispensing_fee, "
+        "admin_fees, rebate_guarantee, key_concerns, analysis_json FROM contracts"
+    ).fetchall()
+    conn.row_factory = None
+    assignments = ", ".join(f"{column} = ?" for column in _CONTRACT_NUMERIC_COLUMNS)
+    for row in rows:
+        try:
+            data = orjson.loads(row["analysis_json"]) if row["analysis_json"] else {}
+        except Exception:
+            data = {}
+        mail = data.get("pricing_terms") or {}
+        pt = {
+            "brand_retail_awp_discount": row["brand_retail"],
+            "generic_retail_awp_discount": row["generic_retail"],
+            "specialty_awp_discount": row["specialty"],
+            "brand_mail_awp_discount": mail.get("brand_mail_awp_discount"),
+            "generic_mail_awp_discount": mail.get("generic_mail_awp_discount"),
+            "retail_dispensing_fee": row["retail_dispensing_fee"],
+            "admin_fees": row["admin_fees"],
+            "rebate_guarantee": row["rebate_guarantee"],
+        }
+        conn.execute(
+            f"UPDATE contracts SET {assignments} WHERE session_id = ?",
+            (*_contract_numbers(pt), row["session_id"]),
+        )
+        try:
+            concerns = orjson.loads(row["key_concerns"] or "[]")
+        except Exception:
+            concerns = []
+        _index_concerns(conn, row["session_id"], concerns)
+        _index_risks(conn, row["session_id"], data.get("cost_risk_areas") or [])
+
+
+def _move_contract_texts(conn: sqlite3.Connection):
+    """Move text stored inline on older contract rows into contract_texts."""
+    conn.execute(
+        "INSERT OR REPLACE INTO contract_texts (session_id, contract_text) "
+        "SELECT session_id, contract_text FROM contracts WHERE contract_text IS NOT NULL"
+    )
+    conn.execute("UPDATE contracts SET contract_text = NULL WHERE contract_text IS NOT NULL")
+
+
 def save_contract(session_id: str, analysis: PBMAnalysisReport, contract_text: str):
     """Save analyzed contract to the library for future benchmarking."""
-    uploaded_at = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
     pt = analysis.pricing_terms
-    with sqlite3.connect(DB_PATH) as conn:
+    with _writer() as conn:
         conn.execute(
-            """
+            f"""
             INSERT OR REPLACE INTO contracts
               (session_id, pbm_name, uploaded_at, overall_grade,
                brand_retail, generic_retail, specialty,
                retail_dispensing_fee, admin_fees, rebate_guarantee,
-               key_concerns, contract_text, analysis_json)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+               key_concerns, analysis_json,
+               {", ".join(_CONTRACT_NUMERIC_COLUMNS)})
+            VALUES (?, ?, CURRENT_TIMESTAMP, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 session_id,
                 analysis.contract_overview.parties,
-                uploaded_at,
                 analysis.overall_grade,
                 pt.brand_retail_awp_discount,
                 pt.generic_retail_awp_discount,
@@ -259,160 +579,171 @@ def save_contract(session_id: str, analysis: PBMAnalysisReport, contract_text: s
                 pt.retail_dispensing_fee,
                 pt.admin_fees,
                 pt.rebate_guarantee,
-                json.dumps(analysis.key_concerns),
-                contract_text,
+                orjson.dumps(analysis.key_concerns).decode(),
                 analysis.model_dump_json(),
+                *_contract_numbers(pt.model_dump()),
             ),
         )
-        conn.commit()
+        conn.execute(
+            "INSERT OR REPLACE INTO contract_texts (session_id, contract_text) VALUES (?, ?)",
+            (session_id, contract_text),
+        )
+        _index_concerns(conn, session_id, analysis.key_concerns)
+        _index_risks(conn, session_id, [item.model_dump() for item in analysis.cost_risk_areas])
+        _bump_library_meta(conn)
+    _bump_contracts_version()
+
+
+def get_cached_analysis(text_hash: str, schema_hash: str, max_age_seconds: float) -> Optional[str]:
+    """Return the cached analysis JSON for this contract text, if one is fresh enough."""
+    with _reader() as conn:
+        row = conn.execute(
+            "SELECT result_json FROM analysis_cache "
+            "WHERE text_hash = ? AND schema_hash = ? AND created_at >= ?",
+            (text_hash, schema_hash, time.time() - max_age_seconds),
+        ).fetchone()
+    return row["result_json"] if row else None
+
+
+def save_cached_analysis(text_hash: str, schema_hash: str, result_json: str) -> None:
+    """Store an analysis result so identical uploads can skip the Claude call."""
+    with _writer() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO analysis_cache (text_hash, schema_hash, result_json, created_at) "
+            "VALUES (?, ?, ?, ?)",
+            (text_hash, schema_hash, result_json, time.time()),
+        )
 
 
 def _parse_dollar(s: str) -> Optional[float]:
     """Extract the first dollar amount from a string, or None."""
-    if not s or s.lower().startswith("not"):
+    if not s or s[:3].lower() == "not":
         return None
-    m = re.search(r'\$\s*(\d+(?:\.\d+)?)', s)
+    m = _DOLLAR_RE.search(s)
     return float(m.group(1)) if m else None
 
 
+# Bumped after every contracts write in this process; library_meta's
+# counter, bumped in the same transactions, catches other worker processes
+_contracts_version = 0
+_contracts_version_lock = threading.Lock()
+
+# (version, stats) of the last library aggregation, swapped as one tuple
+_library_cache: tuple = (None, None)
+
+
+def _bump_contracts_version():
+    global _contracts_version
+    with _contracts_version_lock:
+        _contracts_version += 1
+
+
+def _bump_library_meta(conn: sqlite3.Connection):
+    conn.execute("UPDATE library_meta SET contracts_version = contracts_version + 1 WHERE id = 1")
+
+
+def library_version() -> tuple:
+    """Identify the current contract library contents. Changes only when a
+    contract is saved or rewritten, not on session, lead or cache writes."""
+    with _reader() as conn:
+        row = conn.execute("SELECT contracts_version FROM library_meta WHERE id = 1").fetchone()
+    return _contracts_version, row[0] if row else 0
+
+
 def get_library_benchmarks() -> dict:
     """Return aggregate statistics from the contract library for prompt enrichment and comparison cards."""
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
-        rows = conn.execute(
-            "SELECT overall_grade, brand_retail, generic_retail, specialty, "
-            "retail_dispensing_fee, admin_fees, rebate_guarantee, key_concerns FROM contracts"
-        ).fetchall()
-        json_rows = conn.execute(
-            "SELECT analysis_json FROM contracts WHERE analysis_json IS NOT NULL"
+    global _library_cache
+    # Every analysis and prompt build asks for these; only recompute after a write.
+    # The version is taken before querying, so a write that lands mid-query
+    # leaves the stored entry already stale rather than wrongly current.
+    version = library_version()
+    cached_version, cached = _library_cache
+    if version != cached_version:
+        cached = _compute_library_benchmarks()
+        _library_cache = (version, cached)
+    return dict(cached)
+
+
+def _compute_library_benchmarks() -> dict:
+    with _reader() as conn:
+        grades = [row[0] for row in conn.execute("SELECT overall_grade FROM contracts ORDER BY id")]
+        count = len(grades)
+        if count == 0:
+            return {"contracts_count": 0}
+        averages = conn.execute(
+            "SELECT " + ", ".join(f"AVG({column})" for column in _CONTRACT_NUMERIC_COLUMNS) + " FROM contracts"
+        ).fetchone()
+        item_risk_counts = conn.execute(
+            "SELECT t.risk_level, COUNT(*) FROM contract_risks t "
+            "JOIN contracts c USING (session_id) GROUP BY t.risk_level"
         ).fetchall()
-
-    count = len(rows)
-    if count == 0:
-        return {"contracts_count": 0}
+        top_concerns = _top_counts(conn, "contract_concerns", "concern")
+        # top_risk_areas: prefer analysis_json cost_risk_areas (high-risk items);
+        # fall back to key_concerns from D/F-grade contracts when no json data.
+        top_risk_areas = (
+            _top_counts(conn, "contract_risks", "area", "t.risk_level = 'high' AND t.area != ''")
+            or _top_counts(conn, "contract_concerns", "concern", "c.overall_grade IN ('D', 'F')")
+        )
 
     grade_distribution: dict[str, int] = {"A": 0, "B": 0, "C": 0, "D": 0, "F": 0}
-    grades: list[str] = []
-    brand_retails: list[str] = []
-    generic_retails: list[str] = []
-    specialties: list[str] = []
-    dispensing_fees: list[str] = []
-    admin_fees_list: list[str] = []
-    rebate_guarantees: list[str] = []
-    concern_counts: dict[str, int] = {}
-
-    for row in rows:
-        grade = row["overall_grade"]
+    for grade in grades:
         if grade in grade_distribution:
             grade_distribution[grade] += 1
-        grades.append(grade)
-        brand_retails.append(row["brand_retail"] or "")
-        generic_retails.append(row["generic_retail"] or "")
-        specialties.append(row["specialty"] or "")
-        dispensing_fees.append(row["retail_dispensing_fee"] or "")
-        admin_fees_list.append(row["admin_fees"] or "")
-        rebate_guarantees.append(row["rebate_guarantee"] or "")
-        try:
-            for concern in json.loads(row["key_concerns"] or "[]"):
-                concern_counts[concern] = concern_counts.get(concern, 0) + 1
-        except Exception:
-            pass
 
     # ── Risk distribution ─────────────────────────────────────────────────────
     # Primary source: cost_risk_areas inside analysis_json (item-level).
     # Fallback: derive one risk level per contract from its overall_grade
     # (A/B → low, C → medium, D/F → high) so historical contracts contribute.
-    _GRADE_RISK = {"A": "low", "B": "low", "C": "medium", "D": "high", "F": "high"}
-    risk_counts: dict[str, int] = {"high": 0, "medium": 0, "low": 0}
-    risk_area_counts: dict[str, int] = {}  # from analysis_json cost_risk_areas
-    df_concern_counts: dict[str, int] = {}  # key_concerns from D/F contracts only
-    brand_mails: list[str] = []
-    generic_mails: list[str] = []
-
-    # Contracts with analysis_json: use proper item-level risk data.
-    json_sessions: set[str] = set()
-    for row in json_rows:
-        try:
-            data = json.loads(row["analysis_json"])
-        except Exception:
-            continue
-        session_id = data.get("_session_id")  # may not be present; tracked below
-        for item in data.get("cost_risk_areas", []):
-            level = item.get("risk_level", "").lower()
-            if level in risk_counts:
-                risk_counts[level] += 1
-            if level == "high":
-                area = item.get("area", "")
-                if area:
-                    risk_area_counts[area] = risk_area_counts.get(area, 0) + 1
-        pt = data.get("pricing_terms", {})
-        brand_mails.append(pt.get("brand_mail_awp_discount", "") or "")
-        generic_mails.append(pt.get("generic_mail_awp_discount", "") or "")
-
-    # Fallback: grade-based risk for all contracts (covers historical rows).
-    # We count every contract once; if analysis_json item counts already dominate
-    # they will be non-zero and grade fallback adds context for older contracts.
-    for row in rows:
-        grade = row["overall_grade"] or ""
-        level = _GRADE_RISK.get(grade)
-        if level:
-            risk_counts[level] += 1
-        # Collect key_concerns from D/F contracts for top_risk_areas fallback.
-        if grade in ("D", "F"):
-            try:
-                for concern in json.loads(row["key_concerns"] or "[]"):
-                    df_concern_counts[concern] = df_concern_counts.get(concern, 0) + 1
-            except Exception:
-                pass
-
-    def _avg_awp(strings: list[str]) -> str:
-        vals = [_parse_pct(s) for s in strings]
-        vals = [v for v in vals if v is not None]
-        if not vals:
-            return "N/A"
-        return f"AWP-{sum(vals) / len(vals):.1f}%"
-
-    def _avg_dollar(strings: list[str], suffix: str = "") -> str:
-        vals = [_parse_dollar(s) for s in strings]
-        vals = [v for v in vals if v is not None]
-        if not vals:
-            return "N/A"
-        avg = sum(vals) / len(vals)
-        return f"${avg:.2f}{suffix}"
-
-    top_concerns = sorted(concern_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-    # top_risk_areas: prefer analysis_json cost_risk_areas (high-risk items);
-    # fall back to key_concerns from D/F-grade contracts when no json data.
-    if risk_area_counts:
-        top_risk_areas = sorted(risk_area_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-    else:
-        top_risk_areas = sorted(df_concern_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+    risk_counts: dict[str, int] = {
+        "high": grade_distribution["D"] + grade_distribution["F"],
+        "medium": grade_distribution["C"],
+        "low": grade_distribution["A"] + grade_distribution["B"],
+    }
+    for level, n in item_risk_counts:
+        risk_counts[level] += n
+
+    (avg_brand_retail, avg_generic_retail, avg_specialty, avg_brand_mail, avg_generic_mail,
+     avg_dispensing_fee, avg_admin_fee, avg_rebate_guarantee) = averages
+
+    def _avg_awp(avg: Optional[float]) -> str:
+        return "N/A" if avg is None else f"AWP-{avg:.1f}%"
+
+    def _avg_dollar(avg: Optional[float], suffix: str = "") -> str:
+        return "N/A" if avg is None else f"${avg:.2f}{suffix}"
 
     return {
         "contracts_count": count,
         "grade_distribution": grade_distribution,
         "grades": grades,
-        "avg_brand_retail": _avg_awp(brand_retails),
-        "avg_generic_retail": _avg_awp(generic_retails),
-        "avg_specialty": _avg_awp(specialties),
-        "avg_brand_mail": _avg_awp(brand_mails),
-        "avg_generic_mail": _avg_awp(generic_mails),
-        "avg_dispensing_fee": _avg_dollar(dispensing_fees, " per claim"),
-        "avg_admin_fee": _avg_dollar(admin_fees_list, " PEPM"),
-        "avg_rebate_guarantee": _avg_dollar(rebate_guarantees, " PMPY"),
+        "avg_brand_retail": _avg_awp(avg_brand_retail),
+        "avg_generic_retail": _avg_awp(avg_generic_retail),
+        "avg_specialty": _avg_awp(avg_specialty),
+        "avg_brand_mail": _avg_awp(avg_brand_mail),
+        "avg_generic_mail": _avg_awp(avg_generic_mail),
+        "avg_dispensing_fee": _avg_dollar(avg_dispensing_fee, " per claim"),
+        "avg_admin_fee": _avg_dollar(avg_admin_fee, " PEPM"),
+        "avg_rebate_guarantee": _avg_dollar(avg_rebate_guarantee, " PMPY"),
         "top_concerns": top_concerns,
         "risk_distribution": risk_counts,
         "top_risk_areas": top_risk_areas,
     }
 
 
+def _top_counts(conn: sqlite3.Connection, table: str, column: str, where: str = "1") -> list[tuple]:
+    """The five most frequent values of table.column as (value, count) pairs."""
+    rows = conn.execute(
+        f"SELECT t.{column}, COUNT(*) AS n FROM {table} t JOIN contracts c USING (session_id) "
+        f"WHERE {where} GROUP BY t.{column} ORDER BY n DESC, {_FIRST_SEEN} LIMIT 5"
+    ).fetchall()
+    return [(row[0], row[1]) for row in rows]
+
+
 def scrub_key_concerns() -> dict:
     """Rewrite all stored key_concerns using Claude Haiku to remove party/employer names."""
     import anthropic
     client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
 
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
+    with _reader() as conn:
         rows = conn.execute(
             "SELECT session_id, key_concerns FROM contracts WHERE key_concerns IS NOT NULL"
         ).fetchall()
@@ -424,7 +755,7 @@ def scrub_key_concerns() -> dict:
     for row in rows:
         processed += 1
         try:
-            concerns = json.loads(row["key_concerns"] or "[]")
+            concerns = orjson.loads(row["key_concerns"] or "[]")
         except Exception:
             continue
         if not concerns:
@@ -447,11 +778,14 @@ def scrub_key_concerns() -> dict:
             )
             cleaned = json.loads(response.content[0].text.strip())
             if isinstance(cleaned, list) and len(cleaned) > 0:
-                with sqlite3.connect(DB_PATH) as conn:
+                with _writer() as conn:
                     conn.execute(
                         "UPDATE contracts SET key_concerns = ? WHERE session_id = ?",
-                        (json.dumps(cleaned), row["session_id"]),
+                        (orjson.dumps(cleaned).decode(), row["session_id"]),
                     )
+                    _index_concerns(conn, row["session_id"], cleaned)
+                    _bump_library_meta(conn)
+                _bump_contracts_version()
                 updated += 1
         except Exception as e:
             logging.warning(f"scrub_key_concerns: failed for {row['session_id']}: {e}")
@@ -464,26 +798,25 @@ def scrub_key_concerns() -> dict:
 
 def count_leads() -> int:
     """Return the total number of stored leads."""
-    with sqlite3.connect(DB_PATH) as conn:
+    with _reader() as conn:
         return conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
 
 
 def get_contract_list(page: int = 1, limit: int = 20) -> dict:
     """Return a paginated list of contracts from the library, newest first."""
     offset = (page - 1) * limit
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
+    with _reader() as conn:
         total = conn.execute("SELECT COUNT(*) FROM contracts").fetchone()[0]
         rows = conn.execute(
             "SELECT session_id, pbm_name, uploaded_at, overall_grade, key_concerns "
-            "FROM contracts ORDER BY uploaded_at DESC LIMIT ? OFFSET ?",
+            "FROM contracts ORDER BY uploaded_at DESC, id LIMIT ? OFFSET ?",
             (limit, offset),
         ).fetchall()
 
     contracts = []
     for row in rows:
         try:
-            concerns = json.loads(row["key_concerns"] or "[]")[:2]
+            concerns = orjson.loads(row["key_concerns"] or "[]")[:2]
         except Exception:
             concerns = []
         contracts.append({
@@ -502,21 +835,31 @@ def get_contract_list(page: int = 1, limit: int = 20) -> dict:
     }
 
 
-def get_contract_by_session(session_id: str) -> Optional[dict]:
-    """Return the full contract row for a session_id, or None if not found."""
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
+def get_contract_by_session(session_id: str, include_text: bool = False) -> Optional[dict]:
+    """Return the contract row for a session_id, or None if not found.
+    The contract text is only read (into "contract_text") when include_text is set."""
+    with _reader() as conn:
         row = conn.execute(
             "SELECT * FROM contracts WHERE session_id = ?", (session_id,)
         ).fetchone()
-    return dict(row) if row else None
+        if not row:
+            return None
+        contract = dict(row)
+        # The inline column is legacy and always NULL once migrated
+        del contract["contract_text"]
+        if include_text:
+            text_row = conn.execute(
+                "SELECT contract_text FROM contract_texts WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            contract["contract_text"] = text_row[0] if text_row else None
+    return contract
 
 
 def save_broker_profile(broker_name: str, firm_name: str, email: str, phone: str,
                         logo_path: Optional[str] = None) -> None:
     """Upsert the single broker profile row."""
     updated_at = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-    with sqlite3.connect(DB_PATH) as conn:
+    with _writer() as conn:
         row = conn.execute("SELECT id FROM broker_profile LIMIT 1").fetchone()
         if row:
             conn.execute(
@@ -532,49 +875,49 @@ def save_broker_profile(broker_name: str, firm_name: str, email: str, phone: str
                    VALUES (?, ?, ?, ?, ?, ?)""",
                 (broker_name, firm_name, email, phone, logo_path, updated_at),
             )
-        conn.commit()
 
 
 def get_broker_profile() -> Optional[dict]:
     """Return the broker profile dict or None if not configured."""
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
+    with _reader() as conn:
         row = conn.execute("SELECT * FROM broker_profile LIMIT 1").fetchone()
     return dict(row) if row else None
 
 
-def export_leads_csv() -> str:
-    """Return all leads as a UTF-8 CSV string, newest first."""
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
-        rows = conn.execute(
-            "SELECT * FROM leads ORDER BY submitted_at DESC"
-        ).fetchall()
+_CSV_BATCH_ROWS = 500
+
+
+def _flatten_concerns(key_concerns: Optional[str]) -> str:
+    """Flatten a key_concerns JSON array to a readable string."""
+    try:
+        return "; ".join(orjson.loads(key_concerns or "[]"))
+    except Exception:
+        return key_concerns or ""
+
+
+def export_leads_csv_iter() -> Iterator[str]:
+    """Yield all leads as UTF-8 CSV text in batches of rows, newest first."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    def _drain() -> str:
+        chunk = buf.getvalue()
+        buf.seek(0)
+        buf.truncate(0)
+        return chunk
 
-    output = io.StringIO()
-    writer = csv.writer(output)
     writer.writerow([
         "ID", "Submitted At (UTC)", "First Name", "Last Name",
         "Email", "Phone", "Company", "Grade", "Key Concerns", "Session ID",
     ])
-    for row in rows:
-        # Flatten key_concerns JSON array to a readable string
-        try:
-            concerns = "; ".join(json.loads(row["key_concerns"] or "[]"))
-        except Exception:
-            concerns = row["key_concerns"] or ""
-
-        writer.writerow([
-            row["id"],
-            row["submitted_at"],
-            row["first_name"],
-            row["last_name"],
-            row["email"],
-            row["phone"],
-            row["company"],
-            row["overall_grade"],
-            concerns,
-            row["session_id"],
-        ])
-
-    return output.getvalue()
+    yield _drain()
+
+    with _reader() as conn:
+        cursor = conn.execute(
+            "SELECT id, submitted_at, first_name, last_name, email, phone, company, "
+            "overall_grade, key_concerns, session_id FROM leads ORDER BY submitted_at DESC, id"
+        )
+        # writerows formats a whole batch in C; memory stays bounded by the batch size
+        while batch := cursor.fetchmany(_CSV_BATCH_ROWS):
+            writer.writerows((*row[:8], _flatten_concerns(row[8]), row[9]) for row in batch)
+            yield _drain()
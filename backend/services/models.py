@@ -101,11 +101,10 @@ class SessionStatus(str, Enum):
     ERROR = "error"
 
 
-class SessionData:
-    def __init__(self):
-        self.status: SessionStatus = SessionStatus.PENDING
-        self.status_message: str = "Initializing..."
-        self.analysis_result: Optional[PBMAnalysisReport] = None
-        self.contact_info: Optional[ContactInfo] = None
-        self.pdf_path: Optional[str] = None
-        self.error_message: Optional[str] = None
+class SessionData(BaseModel):
+    status: SessionStatus = SessionStatus.PENDING
+    status_message: str = "Initializing..."
+    analysis_result: Optional[PBMAnalysisReport] = None
+    contact_info: Optional[ContactInfo] = None
+    pdf_path: Optional[str] = None
+    error_message: Optional[str] = None
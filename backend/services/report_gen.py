@@ -5,9 +5,12 @@ Cover page is drawn entirely with canvas; content pages have a running header/fo
 Supports optional broker profile for white-label reports.
 """
 
+import functools
 import os
+import threading
 from datetime import datetime
 from typing import Optional
+from xml.sax.saxutils import escape
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.utils import ImageReader
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -21,6 +24,7 @@ from reportlab.platypus import (
     Table,
     TableStyle,
     PageBreak,
+    CondPageBreak,
     HRFlowable,
     KeepTogether,
 )
@@ -31,6 +35,12 @@ from .models import PBMAnalysisReport, ContactInfo, BrokerProfile
 PAGE_W, PAGE_H = letter   # 612 x 792 points
 CONTENT_W = 6.8 * inch    # 8.5 - 0.85 - 0.85
 
+# Dev only: when set, each doc.build runs under cProfile and its stats are written here
+PDF_PROFILE_DIR = os.getenv("PDF_PROFILE_DIR", "").strip()
+# Reports render concurrently on the CPU pool, but only one profiler can be
+# active per process, so profiled builds take turns
+_profile_lock = threading.Lock()
+
 # ── Brand palette ────────────────────────────────────────────────────────────
 PRIMARY       = colors.HexColor("#1e3a5f")
 PRIMARY_DARK  = colors.HexColor("#152d4a")
@@ -42,19 +52,47 @@ WHITE         = colors.white
 DARK_TEXT     = colors.HexColor("#0f172a")
 MUTED         = colors.HexColor("#64748b")
 
+# Cover page
+COVER_PANEL   = colors.HexColor("#0d2240")
+COVER_SHADOW  = colors.HexColor("#07172a")
+COVER_SUBTEXT = colors.HexColor("#a8c4e0")
+COVER_FINE    = colors.HexColor("#6b96be")
+
+# Table borders and fills
+BORDER        = colors.HexColor("#d1d9e0")
+BORDER_LIGHT  = colors.HexColor("#edf2f7")
+RULE          = colors.HexColor("#e2e8f0")
+ROW_ALT_BG    = colors.HexColor("#f8fafc")
+CONCERN_TEXT  = colors.HexColor("#7f1d1d")
+
+# Status tones: (text, background, border)
+GREEN, GREEN_BG, GREEN_BORDER    = colors.HexColor("#16a34a"), colors.HexColor("#f0fdf4"), colors.HexColor("#86efac")
+BLUE, BLUE_BG, BLUE_BORDER       = colors.HexColor("#1d4ed8"), colors.HexColor("#eff6ff"), colors.HexColor("#bfdbfe")
+AMBER, AMBER_BG, AMBER_BORDER    = colors.HexColor("#d97706"), colors.HexColor("#fffbeb"), colors.HexColor("#fcd34d")
+ORANGE, ORANGE_BG, ORANGE_BORDER = colors.HexColor("#ea580c"), colors.HexColor("#fff7ed"), colors.HexColor("#fdba74")
+RED, RED_BG, RED_BORDER          = colors.HexColor("#dc2626"), colors.HexColor("#fef2f2"), colors.HexColor("#fca5a5")
+
 GRADE_COLORS = {
-    "A": colors.HexColor("#16a34a"),
-    "B": colors.HexColor("#1d4ed8"),
-    "C": colors.HexColor("#d97706"),
-    "D": colors.HexColor("#ea580c"),
-    "F": colors.HexColor("#dc2626"),
+    "A": GREEN,
+    "B": BLUE,
+    "C": AMBER,
+    "D": ORANGE,
+    "F": RED,
 }
 GRADE_BG = {
-    "A": colors.HexColor("#f0fdf4"),
-    "B": colors.HexColor("#eff6ff"),
-    "C": colors.HexColor("#fffbeb"),
-    "D": colors.HexColor("#fff7ed"),
-    "F": colors.HexColor("#fef2f2"),
+    "A": GREEN_BG,
+    "B": BLUE_BG,
+    "C": AMBER_BG,
+    "D": ORANGE_BG,
+    "F": RED_BG,
+}
+# (background, text, border) for the library grade distribution pills
+GRADE_PILL_COLORS = {
+    "A": (GREEN_BG,  GREEN,  GREEN_BORDER),
+    "B": (BLUE_BG,   BLUE,   BLUE_BORDER),
+    "C": (AMBER_BG,  AMBER,  AMBER_BORDER),
+    "D": (ORANGE_BG, ORANGE, ORANGE_BORDER),
+    "F": (RED_BG,    RED,    RED_BORDER),
 }
 GRADE_LABELS = {
     "A": "Excellent — Top of Market",
@@ -64,17 +102,264 @@ GRADE_LABELS = {
     "F": "Unfavorable — Significant Concerns",
 }
 RISK_COLORS = {
-    "high":   colors.HexColor("#dc2626"),
-    "medium": colors.HexColor("#d97706"),
-    "low":    colors.HexColor("#16a34a"),
+    "high":   RED,
+    "medium": AMBER,
+    "low":    GREEN,
 }
 # (background, text) tuples for assessment column
 ASSESSMENT_STYLE = {
-    "favorable":    (colors.HexColor("#f0fdf4"), colors.HexColor("#16a34a")),
-    "at market":    (colors.HexColor("#eff6ff"), colors.HexColor("#1d4ed8")),
-    "below market": (colors.HexColor("#fffbeb"), colors.HexColor("#d97706")),
-    "unfavorable":  (colors.HexColor("#fef2f2"), colors.HexColor("#dc2626")),
+    "favorable":    (GREEN_BG, GREEN),
+    "at market":    (BLUE_BG,  BLUE),
+    "below market": (AMBER_BG, AMBER),
+    "unfavorable":  (RED_BG,   RED),
+}
+# (background, text) tuples for cost savings categories
+SAVINGS_COLORS = {
+    "Biosimilar Opportunity":  (colors.HexColor("#dcfce7"), GREEN),
+    "New Generic Available":   (colors.HexColor("#dbeafe"), BLUE),
+    "Alternative Pharmacy":    (colors.HexColor("#f3e8ff"), colors.HexColor("#7c3aed")),
+    "Coupon/Accumulator":      (colors.HexColor("#ffedd5"), ORANGE),
+    "Formulary Optimization":  (colors.HexColor("#ccfbf1"), colors.HexColor("#0d9488")),
 }
+IMPACT_COLORS = {
+    "High":   RED,
+    "Medium": AMBER,
+    "Low":    BLUE,
+}
+
+
+# ── Table styles ─────────────────────────────────────────────────────────────
+# Styles with no per-report data, built once and shared by every report
+
+# Fixed header and label cells are plain strings drawn with these fonts, which
+# match the table_header / table_cell / table_cell_muted paragraph styles.
+# Cells with analysis text stay Paragraphs so they can wrap.
+_HEADER_TEXT = [
+    ("FONT",      (0, 0), (-1, 0), "Helvetica-Bold", 8.5, 12),
+    ("TEXTCOLOR", (0, 0), (-1, 0), WHITE),
+]
+_LABEL_TEXT = [
+    ("FONT",      (0, 1), (0, -1), "Helvetica", 9.5, 13),
+    ("TEXTCOLOR", (0, 1), (0, -1), DARK_TEXT),
+]
+
+# Grade distribution pills laid out in one row
+_PILL_ROW_STYLE = TableStyle([
+    ("LEFTPADDING",  (0, 0), (-1, -1), 3),
+    ("RIGHTPADDING", (0, 0), (-1, -1), 3),
+    ("VALIGN",       (0, 0), (-1, -1), "MIDDLE"),
+])
+
+# One grade pill ("B: 4"), keyed by grade
+_GRADE_PILL_STYLES = {
+    grade: TableStyle([
+        ("FONT",          (0, 0), (-1, -1), "Helvetica-Bold", 10, 14),
+        ("TEXTCOLOR",     (0, 0), (-1, -1), fg),
+        ("ALIGN",         (0, 0), (-1, -1), "CENTER"),
+        ("BACKGROUND",    (0, 0), (-1, -1), bg),
+        ("BOX",           (0, 0), (-1, -1), 1, border),
+        ("TOPPADDING",    (0, 0), (-1, -1), 5),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 5),
+        ("LEFTPADDING",   (0, 0), (-1, -1), 4),
+        ("RIGHTPADDING",  (0, 0), (-1, -1), 4),
+    ])
+    for grade, (bg, fg, border) in GRADE_PILL_COLORS.items()
+}
+
+# Library comparison: this contract vs. library averages
+_LIBRARY_PRICING_STYLE = TableStyle(_HEADER_TEXT + _LABEL_TEXT + [
+    ("BACKGROUND",    (0, 0), (-1, 0),  PRIMARY),
+    ("ROWBACKGROUNDS",(0, 1), (-1, -1), [WHITE, LIGHT_BG]),
+    ("BOX",           (0, 0), (-1, -1), 0.5, BORDER),
+    ("INNERGRID",     (0, 0), (-1, -1), 0.25, BORDER),
+    ("LINEBEFORE",    (0, 0), (0, -1),  4, ACCENT),
+    ("TOPPADDING",    (0, 0), (-1, -1), 8),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+    ("LEFTPADDING",   (0, 0), (-1, -1), 10),
+    ("RIGHTPADDING",  (0, 0), (-1, -1), 10),
+    ("VALIGN",        (0, 0), (-1, -1), "MIDDLE"),
+])
+
+# Numbered key-concern row; the number is a plain string in white bold
+_CONCERN_ROW_STYLE = TableStyle([
+    ("FONT",      (0, 0), (0, 0), "Helvetica-Bold", 10, 14),
+    ("TEXTCOLOR", (0, 0), (0, 0), WHITE),
+    ("BACKGROUND", (0, 0), (0, 0), RED),
+    ("BACKGROUND", (1, 0), (1, 0), RED_BG),
+    ("BOX", (0, 0), (-1, -1), 0.5, RED_BORDER),
+    ("TOPPADDING",    (0, 0), (-1, -1), 9),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 9),
+    ("LEFTPADDING",   (0, 0), (0, 0), 0),
+    ("RIGHTPADDING",  (0, 0), (0, 0), 0),
+    ("LEFTPADDING",   (1, 0), (1, 0), 13),
+    ("RIGHTPADDING",  (1, 0), (1, 0), 12),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("ALIGN",  (0, 0), (0, 0), "CENTER"),
+])
+
+# Contract overview field/details table
+_OVERVIEW_STYLE = TableStyle(_HEADER_TEXT + _LABEL_TEXT + [
+    # Missing details are a plain "—" string in the table_cell font
+    ("FONT",          (1, 1), (1, -1),  "Helvetica", 9.5, 13),
+    ("TEXTCOLOR",     (1, 1), (1, -1),  DARK_TEXT),
+    ("BACKGROUND",    (0, 0), (-1, 0),  PRIMARY),
+    ("ROWBACKGROUNDS",(0, 1), (-1, -1), [WHITE, LIGHT_BG]),
+    ("BOX",           (0, 0), (-1, -1), 0.5, BORDER),
+    ("LINEAFTER",     (0, 0), (0, -1),  0.5, BORDER),
+    ("LINEBEFORE",    (0, 0), (0, -1),  4,   ACCENT),
+    ("TOPPADDING",    (0, 0), (-1, -1), 8),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+    ("LEFTPADDING",   (0, 0), (-1, -1), 12),
+    ("RIGHTPADDING",  (0, 0), (-1, -1), 10),
+    ("VALIGN",        (0, 0), (-1, -1), "TOP"),
+])
+
+# Pricing terms vs. market benchmark table
+_PRICING_STYLE = TableStyle(_HEADER_TEXT + _LABEL_TEXT + [
+    ("BACKGROUND",    (0, 0), (-1, 0),  PRIMARY),
+    ("ROWBACKGROUNDS",(0, 1), (-1, -1), [WHITE, LIGHT_BG]),
+    ("BOX",           (0, 0), (-1, -1), 0.5, BORDER),
+    ("INNERGRID",     (0, 0), (-1, -1), 0.25, BORDER),
+    ("LINEBEFORE",    (0, 0), (0, -1),  4,   ACCENT),
+    ("TOPPADDING",    (0, 0), (-1, -1), 8),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+    ("LEFTPADDING",   (0, 0), (-1, -1), 10),
+    ("RIGHTPADDING",  (0, 0), (-1, -1), 10),
+    ("VALIGN",        (0, 0), (-1, -1), "TOP"),
+    ("FONT",          (2, 1), (2, -1),  "Helvetica-Oblique", 9, 13),
+    ("TEXTCOLOR",     (2, 1), (2, -1),  MUTED),
+])
+
+# Market comparison table; the assessment column backgrounds are added per report
+_COMP_STYLE = TableStyle(_HEADER_TEXT + _LABEL_TEXT + [
+    ("BACKGROUND",    (0, 0), (-1, 0),  PRIMARY),
+    ("ROWBACKGROUNDS",(0, 1), (-1, -1), [WHITE, LIGHT_BG]),
+    ("BOX",           (0, 0), (-1, -1), 0.5, BORDER),
+    ("INNERGRID",     (0, 0), (-1, -1), 0.25, BORDER),
+    ("LINEBEFORE",    (0, 0), (0, -1),  4,   ACCENT),
+    ("TOPPADDING",    (0, 0), (-1, -1), 8),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+    ("LEFTPADDING",   (0, 0), (-1, -1), 10),
+    ("RIGHTPADDING",  (0, 0), (-1, -1), 10),
+    ("VALIGN",        (0, 0), (-1, -1), "MIDDLE"),
+    ("ALIGN",         (3, 1), (3, -1),  "CENTER"),
+])
+
+# Market position callout box
+_CALLOUT_STYLE = TableStyle([
+    ("BACKGROUND",    (0, 0), (-1, -1), LIGHT_BG),
+    ("LINEBEFORE",    (0, 0), (-1, -1), 4, PRIMARY_LIGHT),
+    ("BOX",           (0, 0), (-1, -1), 0.5, BORDER),
+    ("TOPPADDING",    (0, 0), (-1, -1), 12),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
+    ("LEFTPADDING",   (0, 0), (-1, -1), 16),
+    ("RIGHTPADDING",  (0, 0), (-1, -1), 14),
+])
+
+
+@functools.lru_cache(maxsize=None)
+def _guidance_table_style(count: int) -> TableStyle:
+    """Numbered negotiation guidance, all items in one Table: item k sits in row
+    2k with an unstyled 5pt gap row between items. Numbers are plain strings."""
+    commands = []
+    for r in range(0, 2 * count, 2):
+        commands += [
+            ("FONT",          (0, r), (0, r), "Helvetica-Bold", 11, 14),
+            ("TEXTCOLOR",     (0, r), (0, r), WHITE),
+            ("BACKGROUND",    (0, r), (0, r), ACCENT),
+            ("BACKGROUND",    (1, r), (1, r), LIGHT_BG),
+            ("BOX",           (0, r), (-1, r), 0.5, BORDER),
+            ("TOPPADDING",    (0, r), (-1, r), 10),
+            ("BOTTOMPADDING", (0, r), (-1, r), 10),
+            ("LEFTPADDING",   (0, r), (0, r),   0),
+            ("RIGHTPADDING",  (0, r), (0, r),   0),
+            ("LEFTPADDING",   (1, r), (1, r),   14),
+            ("RIGHTPADDING",  (1, r), (1, r),   12),
+            ("VALIGN",  (0, r), (-1, r), "TOP"),
+            ("ALIGN",   (0, r), (0, r),   "CENTER"),
+        ]
+    return TableStyle(commands)
+
+
+
+@functools.lru_cache(maxsize=128)
+def _table_style(*commands) -> TableStyle:
+    """TableStyle for commands that depend on the analysis (risk level, grade
+    percentile, assessments...). Few color combinations occur in practice, so
+    reports share one TableStyle per distinct command tuple."""
+    return TableStyle(list(commands))
+
+
+@functools.lru_cache(maxsize=None)
+def _risk_block_style(risk_color) -> TableStyle:
+    """Cost risk block; only the badge and accent stripe take the risk color,
+    so there is one TableStyle per RISK_COLORS entry."""
+    return TableStyle([
+        # Row 0: name + badge
+        ("BACKGROUND", (0, 0), (0, 0), LIGHT_BG),
+        ("BACKGROUND", (1, 0), (1, 0), risk_color),
+        # Rows 1-2: span full width
+        ("SPAN",       (0, 1), (1, 1)),
+        ("SPAN",       (0, 2), (1, 2)),
+        ("BACKGROUND", (0, 1), (-1, 1), WHITE),
+        ("BACKGROUND", (0, 2), (-1, 2), ROW_ALT_BG),
+        # Left accent stripe
+        ("LINEBEFORE", (0, 0), (0, -1), 5, risk_color),
+        # Borders
+        ("BOX",        (0, 0), (-1, -1), 0.5, BORDER),
+        ("LINEBELOW",  (0, 0), (-1, 0),  0.5, BORDER),
+        ("LINEBELOW",  (0, 1), (-1, 1),  0.5, BORDER_LIGHT),
+        # Padding
+        ("TOPPADDING",    (0, 0), (-1, -1), 8),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+        ("LEFTPADDING",   (0, 0), (0, 0),  14),
+        ("RIGHTPADDING",  (0, 0), (0, 0),  10),
+        ("LEFTPADDING",   (1, 0), (1, 0),   4),
+        ("RIGHTPADDING",  (1, 0), (1, 0),   4),
+        ("LEFTPADDING",   (0, 1), (0, 2),  14),
+        ("RIGHTPADDING",  (0, 1), (0, 2),  14),
+        ("VALIGN",  (0, 0), (-1, -1), "MIDDLE"),
+        ("ALIGN",   (1, 0), (1, 0),   "CENTER"),
+        ("VALIGN",  (0, 1), (-1, -1), "TOP"),
+    ])
+
+
+# ── Table row templates ──────────────────────────────────────────────────────
+# Static labels and benchmarks; only the analysis fields named here vary per report
+
+# (label, ContractOverview field)
+_OVERVIEW_ROWS = (
+    ("Contracting Parties",  "parties"),
+    ("Contract Term",        "contract_term"),
+    ("Effective Date",       "effective_date"),
+    ("Expiration Date",      "expiration_date"),
+    ("Renewal Terms",        "renewal_terms"),
+    ("Termination",          "termination_provisions"),
+)
+
+# (label, PricingTerms field, market benchmark)
+_PRICING_ROWS = (
+    ("Brand Retail AWP Discount",       "brand_retail_awp_discount",   "15–22% off AWP"),
+    ("Brand Mail Order AWP Discount",   "brand_mail_awp_discount",     "20–28% off AWP"),
+    ("Generic Retail AWP Discount",     "generic_retail_awp_discount", "78–88% off AWP"),
+    ("Generic Mail Order AWP Discount", "generic_mail_awp_discount",   "80–90% off AWP"),
+    ("Specialty AWP Discount",          "specialty_awp_discount",      "10–20% off AWP"),
+    ("Retail Dispensing Fee",           "retail_dispensing_fee",       "$0.00–$2.50/claim"),
+    ("Mail Order Dispensing Fee",       "mail_dispensing_fee",         "$0.00–$1.50/Rx"),
+    ("Administrative Fees",             "admin_fees",                  "0–3% of claims"),
+    ("Rebate Guarantee",                "rebate_guarantee",            "$100–$400 PEPM"),
+    ("MAC Pricing Terms",               "mac_pricing_terms",           "Transparent, appeal rights"),
+)
+
+# (category, MarketComparison benchmark / contract / assessment fields)
+_COMP_ROWS = (
+    ("Brand Retail",   "brand_retail_benchmark",   "brand_retail_contract",   "brand_retail_assessment"),
+    ("Generic Retail", "generic_retail_benchmark", "generic_retail_contract", "generic_retail_assessment"),
+    ("Specialty",      "specialty_benchmark",      "specialty_contract",      "specialty_assessment"),
+)
+
+# Zero-padded section numbers ("01", "02", ...), indexed by number
+_SECTION_NUMS = tuple(f"{n:02d}" for n in range(12))
 
 
 # ── Canvas helpers ───────────────────────────────────────────────────────────
@@ -92,7 +377,7 @@ def _draw_broker_section(c, broker: dict) -> None:
     by = PAGE_H - 490 - 16 - bh  # = 210
 
     # Background panel
-    c.setFillColor(colors.HexColor("#0d2240"))
+    c.setFillColor(COVER_PANEL)
     c.rect(bx, by, bw, bh, fill=1, stroke=0)
 
     # Gold left accent stripe
@@ -138,7 +423,7 @@ def _draw_broker_section(c, broker: dict) -> None:
     if broker.get("phone"):
         parts.append(broker["phone"])
     if parts:
-        c.setFillColor(colors.HexColor("#a8c4e0"))
+        c.setFillColor(COVER_SUBTEXT)
         c.setFont("Helvetica", 9)
         c.drawString(bx + 16, by + 14, "  ·  ".join(parts)[:70])
 
@@ -170,7 +455,7 @@ def _draw_cover(c, analysis: PBMAnalysisReport, contact_info: ContactInfo,
     c.rect(0, 0, PAGE_W, 18, fill=1, stroke=0)
 
     # ── Dark title bar ────────────────────────────────────────────────────
-    c.setFillColor(colors.HexColor("#0d2240"))
+    c.setFillColor(COVER_PANEL)
     c.rect(0, PAGE_H - 82, PAGE_W, 52, fill=1, stroke=0)
 
     # Title text
@@ -179,7 +464,7 @@ def _draw_cover(c, analysis: PBMAnalysisReport, contact_info: ContactInfo,
     c.drawCentredString(PAGE_W / 2, PAGE_H - 57, "PBM CONTRACT ANALYSIS REPORT")
 
     # Subtitle
-    c.setFillColor(colors.HexColor("#a8c4e0"))
+    c.setFillColor(COVER_SUBTEXT)
     c.setFont("Helvetica", 11)
     c.drawCentredString(PAGE_W / 2, PAGE_H - 97,
                         "Confidential  ·  AI-Powered  ·  Benefits Consulting Tool")
@@ -196,7 +481,7 @@ def _draw_cover(c, analysis: PBMAnalysisReport, contact_info: ContactInfo,
     bh = 170
 
     # Drop shadow
-    c.setFillColor(colors.HexColor("#07172a"))
+    c.setFillColor(COVER_SHADOW)
     c.rect(bx + 4, by - 4, bw, bh, fill=1, stroke=0)
 
     # White box
@@ -216,99 +501,98 @@ def _draw_cover(c, analysis: PBMAnalysisReport, contact_info: ContactInfo,
         (by + bh - 136, by + bh - 156), # row 3
     ]
 
-    def info_label(x, y, text):
-        c.setFillColor(MUTED)
-        c.setFont("Helvetica-Bold", 7.5)
-        c.drawString(x, y, text)
-
-    def info_value_bold(x, y, text, size=13):
-        c.setFillColor(DARK_TEXT)
-        c.setFont("Helvetica-Bold", size)
-        c.drawString(x, y, text)
-
-    def info_value(x, y, text, size=12):
-        c.setFillColor(DARK_TEXT)
-        c.setFont("Helvetica", size)
-        c.drawString(x, y, text)
-
-    def separator(y_pos):
-        c.setStrokeColor(colors.HexColor("#e2e8f0"))
-        c.setLineWidth(0.4)
+    # Row separators
+    c.setStrokeColor(RULE)
+    c.setLineWidth(0.4)
+    for y_pos in (row_y[1][0] + 14, row_y[2][0] + 14):
         c.line(lx, y_pos, bx + bw - 18, y_pos)
 
-    info_label(lx, row_y[0][0], "PREPARED FOR")
-    info_label(rx, row_y[0][0], "ANALYSIS DATE")
-    info_value_bold(lx, row_y[0][1], f"{contact_info.first_name} {contact_info.last_name}")
-    info_value(rx, row_y[0][1], analysis_date)
-
-    separator(row_y[1][0] + 14)
-    info_label(lx, row_y[1][0], "COMPANY")
-    info_label(rx, row_y[1][0], "EMAIL")
-    info_value(lx, row_y[1][1], contact_info.company[:42])
-    info_value(rx, row_y[1][1], contact_info.email[:38])
-
-    separator(row_y[2][0] + 14)
-    info_label(lx, row_y[2][0], "PHONE")
-    info_value(lx, row_y[2][1], contact_info.phone)
+    # All info box strings go in one text object (a single BT/ET block), row
+    # by row to keep the reading order; font and color change only when needed
+    text = c.beginText()
+
+    def put(x, y, value):
+        text.setTextOrigin(x, y)
+        text.textOut(value)
+
+    def labels(y, *items):
+        text.setFillColor(MUTED)
+        text.setFont("Helvetica-Bold", 7.5)
+        for x, value in items:
+            put(x, y, value)
+
+    labels(row_y[0][0], (lx, "PREPARED FOR"), (rx, "ANALYSIS DATE"))
+    text.setFillColor(DARK_TEXT)
+    text.setFont("Helvetica-Bold", 13)
+    put(lx, row_y[0][1], f"{contact_info.first_name} {contact_info.last_name}")
+    text.setFont("Helvetica", 12)
+    put(rx, row_y[0][1], analysis_date)
+
+    labels(row_y[1][0], (lx, "COMPANY"), (rx, "EMAIL"))
+    text.setFillColor(DARK_TEXT)
+    text.setFont("Helvetica", 12)
+    put(lx, row_y[1][1], contact_info.company[:42])
+    put(rx, row_y[1][1], contact_info.email[:38])
+
+    labels(row_y[2][0], (lx, "PHONE"))
+    text.setFillColor(DARK_TEXT)
+    text.setFont("Helvetica", 12)
+    put(lx, row_y[2][1], contact_info.phone)
+    c.drawText(text)
 
     # ── Grade box ─────────────────────────────────────────────────────────
     gb_y = PAGE_H - 490
     gb_h = 168
 
     # Drop shadow
-    c.setFillColor(colors.HexColor("#07172a"))
+    c.setFillColor(COVER_SHADOW)
     c.rect(bx + 4, gb_y - 4, bw, gb_h, fill=1, stroke=0)
 
     # Grade background
     c.setFillColor(grade_bg)
     c.rect(bx, gb_y, bw, gb_h, fill=1, stroke=0)
 
-    # Colored left stripe
+    # Colored left stripe and top border
     c.setFillColor(grade_color)
     c.rect(bx, gb_y, 6, gb_h, fill=1, stroke=0)
-
-    # Colored top border
-    c.setFillColor(grade_color)
     c.rect(bx, gb_y + gb_h - 4, bw, 4, fill=1, stroke=0)
 
-    # "OVERALL CONTRACT GRADE" label
-    c.setFillColor(MUTED)
-    c.setFont("Helvetica-Bold", 8)
-    c.drawString(bx + 22, gb_y + gb_h - 24, "OVERALL CONTRACT GRADE")
-
-    # Big grade letter
-    c.setFillColor(grade_color)
-    c.setFont("Helvetica-Bold", 90)
-    c.drawString(bx + 22, gb_y + gb_h - 108, grade)
-
-    # Grade label and description (right of the letter)
-    c.setFillColor(grade_color)
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(bx + 118, gb_y + gb_h - 65, grade_label)
+    # Grade box text, again as one text object
+    text = c.beginText()
 
-    c.setFillColor(MUTED)
-    c.setFont("Helvetica", 9.5)
-    c.drawString(bx + 118, gb_y + gb_h - 83,
-                 "Based on pricing competitiveness, risk exposure,")
-    c.drawString(bx + 118, gb_y + gb_h - 97,
-                 "and client protection vs. current market standards.")
+    # "OVERALL CONTRACT GRADE" label
+    text.setFillColor(MUTED)
+    text.setFont("Helvetica-Bold", 8)
+    put(bx + 22, gb_y + gb_h - 24, "OVERALL CONTRACT GRADE")
+
+    # Big grade letter, then the grade label right of it in the same color
+    text.setFillColor(grade_color)
+    text.setFont("Helvetica-Bold", 90)
+    put(bx + 22, gb_y + gb_h - 108, grade)
+    text.setFont("Helvetica-Bold", 16)
+    put(bx + 118, gb_y + gb_h - 65, grade_label)
+
+    # Description
+    text.setFillColor(MUTED)
+    text.setFont("Helvetica", 9.5)
+    put(bx + 118, gb_y + gb_h - 83, "Based on pricing competitiveness, risk exposure,")
+    put(bx + 118, gb_y + gb_h - 97, "and client protection vs. current market standards.")
+    c.drawText(text)
 
     # ── Broker branding ───────────────────────────────────────────────────────
     if broker:
         _draw_broker_section(c, broker)
 
     # ── Disclaimer ────────────────────────────────────────────────────────
-    c.setFillColor(colors.HexColor("#6b96be"))
+    c.setFillColor(COVER_FINE)
     c.setFont("Helvetica", 8)
     c.drawCentredString(PAGE_W / 2, 32,
                         "This report is AI-generated and intended for qualified "
                         "benefits consultants only.")
 
 
-def _draw_header_footer(c, doc, broker: Optional[dict] = None):
-    """Draw the running header and footer on content pages (2+)."""
-    firm = (broker.get("firm_name") or broker.get("broker_name") or "").strip() if broker else ""
-
+def _draw_page_chrome(c, firm: str) -> None:
+    """Static part of the running header and footer, identical on every content page."""
     # Header bar
     c.setFillColor(PRIMARY)
     c.rect(0, PAGE_H - 34, PAGE_W, 34, fill=1, stroke=0)
@@ -317,17 +601,13 @@ def _draw_header_footer(c, doc, broker: Optional[dict] = None):
     c.setFillColor(ACCENT)
     c.rect(0, PAGE_H - 36, PAGE_W, 2, fill=1, stroke=0)
 
-    # Header text — left: report title, right: broker firm (if set) + page number
+    # Header text — left: report title
     c.setFillColor(WHITE)
     c.setFont("Helvetica-Bold", 7.5)
     c.drawString(0.85 * inch, PAGE_H - 21, "PBM CONTRACT ANALYSIS REPORT")
 
-    c.setFont("Helvetica", 7.5)
-    right_text = f"{firm[:40]}  ·  Page {doc.page}" if firm else f"Page {doc.page}"
-    c.drawRightString(PAGE_W - 0.85 * inch, PAGE_H - 21, right_text)
-
     # Footer separator
-    c.setStrokeColor(colors.HexColor("#d1d9e0"))
+    c.setStrokeColor(BORDER)
     c.setLineWidth(0.4)
     c.line(0.85 * inch, 0.44 * inch, PAGE_W - 0.85 * inch, 0.44 * inch)
 
@@ -338,11 +618,37 @@ def _draw_header_footer(c, doc, broker: Optional[dict] = None):
     c.drawCentredString(PAGE_W / 2, 0.27 * inch, footer_text)
 
 
+def _header_firm(broker: Optional[dict]) -> str:
+    """Broker firm name shown in the running header and footer ("" when unbranded)."""
+    return (broker.get("firm_name") or broker.get("broker_name") or "").strip() if broker else ""
+
+
+def _draw_header_footer(c, doc, firm: str = "", page_prefix: str = "Page "):
+    """Draw the running header and footer on content pages (2+).
+    page_prefix is the fixed text before the page number, formatted once per report."""
+
+    # The static chrome is recorded once per document as a form XObject and
+    # referenced from each page, so its drawing commands aren't repeated
+    if not c.hasForm("page_chrome"):
+        c.beginForm("page_chrome")
+        _draw_page_chrome(c, firm)
+        c.endForm()
+    c.doForm("page_chrome")
+
+    # Header text — right: broker firm (if set) + page number
+    c.setFillColor(WHITE)
+    c.setFont("Helvetica", 7.5)
+    c.drawRightString(PAGE_W - 0.85 * inch, PAGE_H - 21, page_prefix + str(doc.page))
+
+
 # ── Paragraph styles ─────────────────────────────────────────────────────────
 
+@functools.lru_cache(maxsize=1)
 def make_styles() -> dict:
+    """Shared paragraph styles, built once per process. Reports never modify
+    them, so sharing is safe; color-dependent variants come from colored_style()."""
     base = getSampleStyleSheet()
-    return {
+    styles = {
         "section_num": ParagraphStyle(
             "section_num", parent=base["Normal"],
             fontSize=8.5, fontName="Helvetica-Bold", textColor=ACCENT,
@@ -386,7 +692,7 @@ def make_styles() -> dict:
         ),
         "concern_text": ParagraphStyle(
             "concern_text", parent=base["Normal"],
-            fontSize=10, fontName="Helvetica", textColor=colors.HexColor("#7f1d1d"),
+            fontSize=10, fontName="Helvetica", textColor=CONCERN_TEXT,
             leading=14,
         ),
         "market_summary": ParagraphStyle(
@@ -399,6 +705,56 @@ def make_styles() -> dict:
             fontSize=8, fontName="Helvetica", textColor=MUTED, alignment=TA_CENTER,
         ),
     }
+    # Row-level styles used inside the report loops
+    styles.update({
+        "badge": ParagraphStyle(
+            "badge", parent=styles["body_left"],
+            textColor=WHITE, fontName="Helvetica-Bold",
+            fontSize=8.5, spaceAfter=0, alignment=TA_CENTER,
+        ),
+        "risk_heading": ParagraphStyle(
+            "risk_heading", parent=styles["subsection_heading"],
+            spaceBefore=0, spaceAfter=0, textColor=DARK_TEXT,
+        ),
+        "savings_heading": ParagraphStyle(
+            "savings_heading", parent=styles["subsection_heading"],
+            spaceBefore=0, spaceAfter=0, textColor=DARK_TEXT, fontSize=10.5,
+        ),
+        "glossary_term": ParagraphStyle(
+            "pbm_glossary_term", parent=styles["subsection_heading"],
+            fontSize=10.5, spaceBefore=10, spaceAfter=2, textColor=PRIMARY,
+        ),
+        "glossary_def": ParagraphStyle(
+            "pbm_glossary_def", parent=styles["body"],
+            fontSize=9.5, leading=14, spaceAfter=2,
+        ),
+        "glossary_example": ParagraphStyle(
+            "pbm_glossary_example", parent=styles["body"],
+            fontSize=9, fontName="Helvetica-Oblique", textColor=MUTED,
+            leading=13, spaceAfter=0,
+        ),
+    })
+    return styles
+
+
+# (parent style, overrides) for styles whose text color depends on the analysis
+_COLORED_ROLES = {
+    "percentile": ("body_left",  dict(fontName="Helvetica-Bold", fontSize=11, alignment=TA_CENTER)),
+    "assessment": ("table_cell", dict(fontName="Helvetica-Bold")),
+    "category":   ("body_left",  dict(fontName="Helvetica-Bold", fontSize=8.5, spaceAfter=0)),
+    "note":       ("table_cell", {}),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def colored_style(role: str, color) -> ParagraphStyle:
+    """A _COLORED_ROLES style tinted with color. Colors all come from the palette,
+    so the cache stays small and every report reuses the same objects."""
+    parent, overrides = _COLORED_ROLES[role]
+    return ParagraphStyle(
+        f"{role}_{color.hexval()}", parent=make_styles()[parent],
+        textColor=color, **overrides,
+    )
 
 
 # ── Story helpers ────────────────────────────────────────────────────────────
@@ -424,6 +780,25 @@ def get_assessment_style(assessment: str):
 
 # ── Main report builder ──────────────────────────────────────────────────────
 
+def _profiled_build(doc, story, output_path: str, **build_kwargs):
+    """Run doc.build under cProfile and write cumulative-sorted stats to PDF_PROFILE_DIR."""
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    with _profile_lock:
+        profiler.runcall(doc.build, story, **build_kwargs)
+        finished = datetime.now()
+
+    os.makedirs(PDF_PROFILE_DIR, exist_ok=True)
+    # Timestamp and pid keep repeat builds and other workers from overwriting each other
+    stem = os.path.splitext(os.path.basename(output_path))[0]
+    stats_path = os.path.join(PDF_PROFILE_DIR, f"{stem}-{finished:%Y%m%d-%H%M%S-%f}-{os.getpid()}.prof.txt")
+    with open(stats_path, "w") as f:
+        pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(60)
+    print(f"[Report] Build profile written to {stats_path}")
+
+
 def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
                         output_path: str, broker: Optional[dict] = None):
     analysis_date = datetime.now().strftime("%B %d, %Y")
@@ -431,11 +806,8 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
     # Shift by an additional 1 when Cost Savings section is present
     _o = 1 if analysis.library_comparison else 0
     _s = 1 if analysis.savings_opportunities else 0
-    def sn(n: int) -> str:
-        return f"{n + _o:02d}"
-    def snl(n: int) -> str:
-        """Section number for sections after Cost Savings (shifted by savings offset too)."""
-        return f"{n + _o + _s:02d}"
+    sn = _SECTION_NUMS[_o:]          # sn[n]: number for section n
+    snl = _SECTION_NUMS[_o + _s:]    # snl[n]: sections after Cost Savings (shifted by savings offset too)
 
     doc = SimpleDocTemplate(
         output_path,
@@ -448,6 +820,10 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
 
     styles = make_styles()
 
+    # Running header text that doesn't change from page to page
+    firm = _header_firm(broker)
+    page_prefix = f"{firm[:40]}  ·  Page " if firm else "Page "
+
     # Page callbacks (closures capture analysis/contact_info/date/broker)
     def _on_first_page(canvas, doc):
         canvas.saveState()
@@ -456,7 +832,7 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
 
     def _on_later_pages(canvas, doc):
         canvas.saveState()
-        _draw_header_footer(canvas, doc, broker=broker)
+        _draw_header_footer(canvas, doc, firm, page_prefix)
         canvas.restoreState()
 
     story = []
@@ -474,9 +850,9 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
 
         # Summary line: count + percentile badge
         is_top = lc.grade_percentile.startswith("top")
-        pct_color = colors.HexColor("#16a34a") if is_top else colors.HexColor("#dc2626")
-        pct_bg    = colors.HexColor("#f0fdf4") if is_top else colors.HexColor("#fef2f2")
-        pct_border= colors.HexColor("#86efac") if is_top else colors.HexColor("#fca5a5")
+        pct_color = GREEN if is_top else RED
+        pct_bg    = GREEN_BG if is_top else RED_BG
+        pct_border= GREEN_BORDER if is_top else RED_BORDER
 
         summary_row = Table(
             [[
@@ -484,22 +860,15 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
                     f"Benchmarked against <b>{lc.contracts_in_library}</b> contracts in our database",
                     styles["body_left"],
                 ),
-                Paragraph(
-                    lc.grade_percentile,
-                    ParagraphStyle(
-                        "lc_pct", parent=styles["body_left"],
-                        textColor=pct_color, fontName="Helvetica-Bold",
-                        fontSize=11, alignment=TA_CENTER,
-                    ),
-                ),
+                Paragraph(lc.grade_percentile, colored_style("percentile", pct_color)),
             ]],
             colWidths=[CONTENT_W - 1.4 * inch, 1.4 * inch],
         )
-        summary_row.setStyle(TableStyle([
+        summary_row.setStyle(_table_style(
             ("BACKGROUND",    (0, 0), (0, 0), LIGHT_BG),
             ("BACKGROUND",    (1, 0), (1, 0), pct_bg),
-            ("BOX",           (0, 0), (-1, -1), 0.5, colors.HexColor("#d1d9e0")),
-            ("LINEAFTER",     (0, 0), (0, 0), 0.5, colors.HexColor("#d1d9e0")),
+            ("BOX",           (0, 0), (-1, -1), 0.5, BORDER),
+            ("LINEAFTER",     (0, 0), (0, 0), 0.5, BORDER),
             ("LINEBEFORE",    (0, 0), (0, -1), 4, ACCENT),
             ("BOX",           (1, 0), (1, 0), 1, pct_border),
             ("TOPPADDING",    (0, 0), (-1, -1), 10),
@@ -507,40 +876,21 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
             ("LEFTPADDING",   (0, 0), (0, 0),  14),
             ("RIGHTPADDING",  (0, 0), (0, 0),  10),
             ("VALIGN",        (0, 0), (-1, -1), "MIDDLE"),
-        ]))
+        ))
         story.append(summary_row)
         story.append(Spacer(1, 0.14 * inch))
 
         # Grade distribution pills row
-        GRADE_PILL_COLORS = {
-            "A": (colors.HexColor("#f0fdf4"), colors.HexColor("#16a34a"), colors.HexColor("#86efac")),
-            "B": (colors.HexColor("#eff6ff"), colors.HexColor("#1d4ed8"), colors.HexColor("#bfdbfe")),
-            "C": (colors.HexColor("#fffbeb"), colors.HexColor("#d97706"), colors.HexColor("#fcd34d")),
-            "D": (colors.HexColor("#fff7ed"), colors.HexColor("#ea580c"), colors.HexColor("#fdba74")),
-            "F": (colors.HexColor("#fef2f2"), colors.HexColor("#dc2626"), colors.HexColor("#fca5a5")),
-        }
         dist_cells = []
         for grade in ["A", "B", "C", "D", "F"]:
             count = lc.grade_distribution.get(grade, 0)
             if count == 0:
                 continue
-            bg, fg, border = GRADE_PILL_COLORS.get(grade, (LIGHT_BG, DARK_TEXT, colors.HexColor("#d1d9e0")))
             cell = Table(
-                [[Paragraph(f"{grade}: {count}", ParagraphStyle(
-                    f"gp{grade}", parent=styles["body_left"],
-                    textColor=fg, fontName="Helvetica-Bold",
-                    fontSize=10, alignment=TA_CENTER, spaceAfter=0,
-                ))]],
+                [[f"{grade}: {count}"]],
                 colWidths=[0.7 * inch],
             )
-            cell.setStyle(TableStyle([
-                ("BACKGROUND",    (0, 0), (-1, -1), bg),
-                ("BOX",           (0, 0), (-1, -1), 1, border),
-                ("TOPPADDING",    (0, 0), (-1, -1), 5),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 5),
-                ("LEFTPADDING",   (0, 0), (-1, -1), 4),
-                ("RIGHTPADDING",  (0, 0), (-1, -1), 4),
-            ]))
+            cell.setStyle(_GRADE_PILL_STYLES[grade])
             dist_cells.append(cell)
 
         if dist_cells:
@@ -549,33 +899,25 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
                 [dist_cells],
                 colWidths=[0.7 * inch] * len(dist_cells),
             )
-            pill_row.setStyle(TableStyle([
-                ("LEFTPADDING",  (0, 0), (-1, -1), 3),
-                ("RIGHTPADDING", (0, 0), (-1, -1), 3),
-                ("VALIGN",       (0, 0), (-1, -1), "MIDDLE"),
-            ]))
+            pill_row.setStyle(_PILL_ROW_STYLE)
             story.append(pill_row)
             story.append(Spacer(1, 0.16 * inch))
 
         # Pricing comparison table
         pricing_comp_data = [
+            ["Pricing Category", "This Contract", "Library Average"],
             [
-                Paragraph("Pricing Category",  styles["table_header"]),
-                Paragraph("This Contract",     styles["table_header"]),
-                Paragraph("Library Average",   styles["table_header"]),
-            ],
-            [
-                Paragraph("Brand Retail AWP Discount",   styles["table_cell"]),
+                "Brand Retail AWP Discount",
                 Paragraph(lc.this_brand_retail,          styles["table_cell_bold"]),
                 Paragraph(lc.avg_brand_retail,           styles["table_cell_muted"]),
             ],
             [
-                Paragraph("Generic Retail AWP Discount", styles["table_cell"]),
+                "Generic Retail AWP Discount",
                 Paragraph(lc.this_generic_retail,        styles["table_cell_bold"]),
                 Paragraph(lc.avg_generic_retail,         styles["table_cell_muted"]),
             ],
             [
-                Paragraph("Specialty AWP Discount",      styles["table_cell"]),
+                "Specialty AWP Discount",
                 Paragraph(lc.this_specialty,             styles["table_cell_bold"]),
                 Paragraph(lc.avg_specialty,              styles["table_cell_muted"]),
             ],
@@ -584,183 +926,91 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
             pricing_comp_data,
             colWidths=[2.8 * inch, 2.0 * inch, 2.0 * inch],
         )
-        pricing_comp_table.setStyle(TableStyle([
-            ("BACKGROUND",    (0, 0), (-1, 0),  PRIMARY),
-            ("ROWBACKGROUNDS",(0, 1), (-1, -1), [WHITE, LIGHT_BG]),
-            ("BOX",           (0, 0), (-1, -1), 0.5, colors.HexColor("#d1d9e0")),
-            ("INNERGRID",     (0, 0), (-1, -1), 0.25, colors.HexColor("#d1d9e0")),
-            ("LINEBEFORE",    (0, 0), (0, -1),  4, ACCENT),
-            ("TOPPADDING",    (0, 0), (-1, -1), 8),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-            ("LEFTPADDING",   (0, 0), (-1, -1), 10),
-            ("RIGHTPADDING",  (0, 0), (-1, -1), 10),
-            ("VALIGN",        (0, 0), (-1, -1), "MIDDLE"),
-        ]))
+        pricing_comp_table.setStyle(_LIBRARY_PRICING_STYLE)
         story.append(pricing_comp_table)
         story.append(Spacer(1, 0.25 * inch))
 
     # ── 01 EXECUTIVE SUMMARY ────────────────────────────────────────────────
-    story += section_header(sn(1), "Executive Summary", styles)
+    story += section_header(sn[1], "Executive Summary", styles)
     for para in analysis.executive_summary.split("\n\n"):
         if para.strip():
             story.append(Paragraph(para.strip(), styles["body"]))
     story.append(Spacer(1, 0.18 * inch))
 
     # ── 02 KEY CONCERNS ─────────────────────────────────────────────────────
-    story += section_header(sn(2), "Key Concerns", styles)
+    story += section_header(sn[2], "Key Concerns", styles)
 
     for i, concern in enumerate(analysis.key_concerns, 1):
         row = Table(
             [[
-                Paragraph(str(i), ParagraphStyle(
-                    f"cn{i}", parent=styles["body_left"],
-                    textColor=WHITE, fontName="Helvetica-Bold",
-                    fontSize=10, alignment=TA_CENTER, spaceAfter=0,
-                )),
+                str(i),
                 Paragraph(concern, styles["concern_text"]),
             ]],
             colWidths=[0.38 * inch, CONTENT_W - 0.38 * inch],
         )
-        row.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (0, 0), colors.HexColor("#dc2626")),
-            ("BACKGROUND", (1, 0), (1, 0), colors.HexColor("#fef2f2")),
-            ("BOX", (0, 0), (-1, -1), 0.5, colors.HexColor("#fca5a5")),
-            ("TOPPADDING",    (0, 0), (-1, -1), 9),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 9),
-            ("LEFTPADDING",   (0, 0), (0, 0), 0),
-            ("RIGHTPADDING",  (0, 0), (0, 0), 0),
-            ("LEFTPADDING",   (1, 0), (1, 0), 13),
-            ("RIGHTPADDING",  (1, 0), (1, 0), 12),
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("ALIGN",  (0, 0), (0, 0), "CENTER"),
-        ]))
+        row.setStyle(_CONCERN_ROW_STYLE)
         story.append(row)
         story.append(Spacer(1, 5))
 
     story.append(Spacer(1, 0.18 * inch))
 
     # ── 03 CONTRACT OVERVIEW ────────────────────────────────────────────────
-    story += section_header(sn(3), "Contract Overview", styles)
+    story += section_header(sn[3], "Contract Overview", styles)
 
     co = analysis.contract_overview
     overview_data = [
-        [Paragraph("Field", styles["table_header"]),
-         Paragraph("Details", styles["table_header"])],
+        ["Field", "Details"],
     ] + [
-        [Paragraph(label, styles["table_cell"]),
-         Paragraph(value or "—", styles["table_cell"])]
-        for label, value in [
-            ("Contracting Parties",  co.parties),
-            ("Contract Term",        co.contract_term),
-            ("Effective Date",       co.effective_date),
-            ("Expiration Date",      co.expiration_date),
-            ("Renewal Terms",        co.renewal_terms),
-            ("Termination",          co.termination_provisions),
-        ]
+        [label, Paragraph(value, styles["table_cell"]) if (value := getattr(co, attr)) else "—"]
+        for label, attr in _OVERVIEW_ROWS
     ]
     overview_table = Table(overview_data, colWidths=[2.0 * inch, 4.8 * inch])
-    overview_table.setStyle(TableStyle([
-        ("BACKGROUND",    (0, 0), (-1, 0),  PRIMARY),
-        ("ROWBACKGROUNDS",(0, 1), (-1, -1), [WHITE, LIGHT_BG]),
-        ("BOX",           (0, 0), (-1, -1), 0.5, colors.HexColor("#d1d9e0")),
-        ("LINEAFTER",     (0, 0), (0, -1),  0.5, colors.HexColor("#d1d9e0")),
-        ("LINEBEFORE",    (0, 0), (0, -1),  4,   ACCENT),
-        ("TOPPADDING",    (0, 0), (-1, -1), 8),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-        ("LEFTPADDING",   (0, 0), (-1, -1), 12),
-        ("RIGHTPADDING",  (0, 0), (-1, -1), 10),
-        ("VALIGN",        (0, 0), (-1, -1), "TOP"),
-    ]))
+    overview_table.setStyle(_OVERVIEW_STYLE)
     story.append(overview_table)
     story.append(Spacer(1, 0.3 * inch))
 
     # ── 04 PRICING TERMS ────────────────────────────────────────────────────
-    story += section_header(sn(4), "Pricing Terms", styles)
+    story += section_header(sn[4], "Pricing Terms", styles)
 
     pt = analysis.pricing_terms
     pricing_rows = [
-        ("Brand Retail AWP Discount",       pt.brand_retail_awp_discount,   "15–22% off AWP"),
-        ("Brand Mail Order AWP Discount",   pt.brand_mail_awp_discount,     "20–28% off AWP"),
-        ("Generic Retail AWP Discount",     pt.generic_retail_awp_discount, "78–88% off AWP"),
-        ("Generic Mail Order AWP Discount", pt.generic_mail_awp_discount,   "80–90% off AWP"),
-        ("Specialty AWP Discount",          pt.specialty_awp_discount,      "10–20% off AWP"),
-        ("Retail Dispensing Fee",           pt.retail_dispensing_fee,       "$0.00–$2.50/claim"),
-        ("Mail Order Dispensing Fee",       pt.mail_dispensing_fee,         "$0.00–$1.50/Rx"),
-        ("Administrative Fees",            pt.admin_fees,                  "0–3% of claims"),
-        ("Rebate Guarantee",               pt.rebate_guarantee,            "$100–$400 PEPM"),
-        ("MAC Pricing Terms",              pt.mac_pricing_terms,           "Transparent, appeal rights"),
+        (label, getattr(pt, attr), benchmark) for label, attr, benchmark in _PRICING_ROWS
     ]
     pricing_data = [
-        [Paragraph("Pricing Component", styles["table_header"]),
-         Paragraph("Contract Terms",    styles["table_header"]),
-         Paragraph("Market Benchmark",  styles["table_header"])],
+        ["Pricing Component", "Contract Terms", "Market Benchmark"],
     ] + [
-        [Paragraph(label,     styles["table_cell"]),
-         Paragraph(contract,  styles["table_cell_bold"]),
-         Paragraph(benchmark, styles["table_cell_muted"])]
+        [label, Paragraph(contract, styles["table_cell_bold"]), benchmark]
         for label, contract, benchmark in pricing_rows
     ]
     pricing_table = Table(pricing_data, colWidths=[2.4 * inch, 2.5 * inch, 1.9 * inch])
-    pricing_table.setStyle(TableStyle([
-        ("BACKGROUND",    (0, 0), (-1, 0),  PRIMARY),
-        ("ROWBACKGROUNDS",(0, 1), (-1, -1), [WHITE, LIGHT_BG]),
-        ("BOX",           (0, 0), (-1, -1), 0.5, colors.HexColor("#d1d9e0")),
-        ("INNERGRID",     (0, 0), (-1, -1), 0.25, colors.HexColor("#d1d9e0")),
-        ("LINEBEFORE",    (0, 0), (0, -1),  4,   ACCENT),
-        ("TOPPADDING",    (0, 0), (-1, -1), 8),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-        ("LEFTPADDING",   (0, 0), (-1, -1), 10),
-        ("RIGHTPADDING",  (0, 0), (-1, -1), 10),
-        ("VALIGN",        (0, 0), (-1, -1), "TOP"),
-    ]))
+    pricing_table.setStyle(_PRICING_STYLE)
     story.append(pricing_table)
     story.append(Spacer(1, 0.25 * inch))
 
     # ── 05 MARKET COMPARISON ────────────────────────────────────────────────
-    story += section_header(sn(5), "Market Comparison", styles)
+    story += section_header(sn[5], "Market Comparison", styles)
 
     mc = analysis.market_comparison
     comp_rows = [
-        ("Brand Retail",  mc.brand_retail_benchmark,  mc.brand_retail_contract,  mc.brand_retail_assessment),
-        ("Generic Retail",mc.generic_retail_benchmark, mc.generic_retail_contract, mc.generic_retail_assessment),
-        ("Specialty",     mc.specialty_benchmark,      mc.specialty_contract,      mc.specialty_assessment),
+        (cat, getattr(mc, bench), getattr(mc, contract), getattr(mc, assess))
+        for cat, bench, contract, assess in _COMP_ROWS
     ]
     comp_data = [
-        [Paragraph("Category",         styles["table_header"]),
-         Paragraph("Market Benchmark", styles["table_header"]),
-         Paragraph("This Contract",    styles["table_header"]),
-         Paragraph("Assessment",       styles["table_header"])],
+        ["Category", "Market Benchmark", "This Contract", "Assessment"],
     ] + [
-        [Paragraph(cat,      styles["table_cell"]),
+        [cat,
          Paragraph(bench,    styles["table_cell"]),
          Paragraph(contract, styles["table_cell_bold"]),
-         Paragraph(assess,   ParagraphStyle(
-             f"as{i}", parent=styles["table_cell"],
-             textColor=get_assessment_style(assess)[1],
-             fontName="Helvetica-Bold",
-         ))]
-        for i, (cat, bench, contract, assess) in enumerate(comp_rows)
-    ]
-    comp_style = [
-        ("BACKGROUND",    (0, 0), (-1, 0),  PRIMARY),
-        ("ROWBACKGROUNDS",(0, 1), (-1, -1), [WHITE, LIGHT_BG]),
-        ("BOX",           (0, 0), (-1, -1), 0.5, colors.HexColor("#d1d9e0")),
-        ("INNERGRID",     (0, 0), (-1, -1), 0.25, colors.HexColor("#d1d9e0")),
-        ("LINEBEFORE",    (0, 0), (0, -1),  4,   ACCENT),
-        ("TOPPADDING",    (0, 0), (-1, -1), 8),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-        ("LEFTPADDING",   (0, 0), (-1, -1), 10),
-        ("RIGHTPADDING",  (0, 0), (-1, -1), 10),
-        ("VALIGN",        (0, 0), (-1, -1), "MIDDLE"),
-        ("ALIGN",         (3, 1), (3, -1),  "CENTER"),
+         Paragraph(assess,   colored_style("assessment", get_assessment_style(assess)[1]))]
+        for cat, bench, contract, assess in comp_rows
     ]
-    # Colored background for assessment column
-    for i, (_, _, _, assess) in enumerate(comp_rows, 1):
-        bg, _ = get_assessment_style(assess)
-        comp_style.append(("BACKGROUND", (3, i), (3, i), bg))
-
     comp_table = Table(comp_data, colWidths=[1.4 * inch, 2.0 * inch, 2.0 * inch, 1.4 * inch])
-    comp_table.setStyle(TableStyle(comp_style))
+    comp_table.setStyle(_COMP_STYLE)
+    # Colored background for assessment column
+    comp_table.setStyle(_table_style(*(
+        ("BACKGROUND", (3, i), (3, i), get_assessment_style(assess)[0])
+        for i, (_, _, _, assess) in enumerate(comp_rows, 1)
+    )))
     story.append(comp_table)
     story.append(Spacer(1, 0.12 * inch))
 
@@ -769,20 +1019,12 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
         [[Paragraph(mc.overall_market_position, styles["market_summary"])]],
         colWidths=[CONTENT_W],
     )
-    callout.setStyle(TableStyle([
-        ("BACKGROUND",    (0, 0), (-1, -1), LIGHT_BG),
-        ("LINEBEFORE",    (0, 0), (-1, -1), 4, PRIMARY_LIGHT),
-        ("BOX",           (0, 0), (-1, -1), 0.5, colors.HexColor("#d1d9e0")),
-        ("TOPPADDING",    (0, 0), (-1, -1), 12),
-        ("BOTTOMPADDING", (0, 0), (-1, -1), 12),
-        ("LEFTPADDING",   (0, 0), (-1, -1), 16),
-        ("RIGHTPADDING",  (0, 0), (-1, -1), 14),
-    ]))
+    callout.setStyle(_CALLOUT_STYLE)
     story.append(callout)
     story.append(Spacer(1, 0.25 * inch))
 
     # ── 06 COST RISK AREAS ──────────────────────────────────────────────────
-    story += section_header(sn(6), "Cost Risk Areas", styles)
+    story += section_header(sn[6], "Cost Risk Areas", styles)
 
     for risk in analysis.cost_risk_areas:
         risk_color = RISK_COLORS.get(risk.risk_level.lower(), MUTED)
@@ -792,15 +1034,8 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
         risk_block = Table(
             [
                 [
-                    Paragraph(risk.area, ParagraphStyle(
-                        f"rh{risk.area[:4]}", parent=styles["subsection_heading"],
-                        spaceBefore=0, spaceAfter=0, textColor=DARK_TEXT,
-                    )),
-                    Paragraph(risk_label, ParagraphStyle(
-                        f"rb{risk.area[:4]}", parent=styles["body_left"],
-                        textColor=WHITE, fontName="Helvetica-Bold",
-                        fontSize=8.5, spaceAfter=0, alignment=TA_CENTER,
-                    )),
+                    Paragraph(risk.area, styles["risk_heading"]),
+                    Paragraph(risk_label, styles["badge"]),
                 ],
                 [
                     Paragraph(risk.description, styles["table_cell"]),
@@ -808,51 +1043,21 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
                 ],
                 [
                     Paragraph(
-                        f"<b>Est. Impact:</b> {risk.financial_impact}",
-                        ParagraphStyle(
-                            f"ri{risk.area[:4]}", parent=styles["table_cell"],
-                            textColor=risk_color,
-                        ),
+                        f"<b>Est. Impact:</b> {escape(risk.financial_impact)}",
+                        colored_style("note", risk_color),
                     ),
                     "",
                 ],
             ],
             colWidths=[CONTENT_W - 0.9 * inch, 0.9 * inch],
         )
-        risk_block.setStyle(TableStyle([
-            # Row 0: name + badge
-            ("BACKGROUND", (0, 0), (0, 0), LIGHT_BG),
-            ("BACKGROUND", (1, 0), (1, 0), risk_color),
-            # Rows 1-2: span full width
-            ("SPAN",       (0, 1), (1, 1)),
-            ("SPAN",       (0, 2), (1, 2)),
-            ("BACKGROUND", (0, 1), (-1, 1), WHITE),
-            ("BACKGROUND", (0, 2), (-1, 2), colors.HexColor("#f8fafc")),
-            # Left accent stripe
-            ("LINEBEFORE", (0, 0), (0, -1), 5, risk_color),
-            # Borders
-            ("BOX",        (0, 0), (-1, -1), 0.5, colors.HexColor("#d1d9e0")),
-            ("LINEBELOW",  (0, 0), (-1, 0),  0.5, colors.HexColor("#d1d9e0")),
-            ("LINEBELOW",  (0, 1), (-1, 1),  0.5, colors.HexColor("#edf2f7")),
-            # Padding
-            ("TOPPADDING",    (0, 0), (-1, -1), 8),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-            ("LEFTPADDING",   (0, 0), (0, 0),  14),
-            ("RIGHTPADDING",  (0, 0), (0, 0),  10),
-            ("LEFTPADDING",   (1, 0), (1, 0),   4),
-            ("RIGHTPADDING",  (1, 0), (1, 0),   4),
-            ("LEFTPADDING",   (0, 1), (0, 2),  14),
-            ("RIGHTPADDING",  (0, 1), (0, 2),  14),
-            ("VALIGN",  (0, 0), (-1, -1), "MIDDLE"),
-            ("ALIGN",   (1, 0), (1, 0),   "CENTER"),
-            ("VALIGN",  (0, 1), (-1, -1), "TOP"),
-        ]))
+        risk_block.setStyle(_risk_block_style(risk_color))
         story.append(KeepTogether([risk_block, Spacer(1, 9)]))
 
     story.append(Spacer(1, 0.25 * inch))
 
     # ── 07 NEGOTIATION GUIDANCE ─────────────────────────────────────────────
-    story += section_header(sn(7), "Negotiation Guidance", styles)
+    story += section_header(sn[7], "Negotiation Guidance", styles)
     story.append(Paragraph(
         "The following recommendations are specific to the terms found in this contract. "
         "Present these points during renegotiation to improve client value.",
@@ -860,38 +1065,26 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
     ))
     story.append(Spacer(1, 0.1 * inch))
 
-    for i, guidance in enumerate(analysis.negotiation_guidance, 1):
-        g_row = Table(
-            [[
-                Paragraph(str(i), ParagraphStyle(
-                    f"gn{i}", parent=styles["body_left"],
-                    textColor=WHITE, fontName="Helvetica-Bold",
-                    fontSize=11, alignment=TA_CENTER, spaceAfter=0,
-                )),
-                Paragraph(guidance, styles["body_left"]),
-            ]],
+    guidance_count = len(analysis.negotiation_guidance)
+    if guidance_count:
+        guidance_data = []
+        for i, guidance in enumerate(analysis.negotiation_guidance, 1):
+            if i > 1:
+                guidance_data.append(["", ""])
+            guidance_data.append([str(i), Paragraph(guidance, styles["body_left"])])
+        guidance_table = Table(
+            guidance_data,
             colWidths=[0.38 * inch, CONTENT_W - 0.38 * inch],
+            rowHeights=[None, 5] * (guidance_count - 1) + [None],
         )
-        g_row.setStyle(TableStyle([
-            ("BACKGROUND",    (0, 0), (0, 0), ACCENT),
-            ("BACKGROUND",    (1, 0), (1, 0), LIGHT_BG),
-            ("BOX",           (0, 0), (-1, -1), 0.5, colors.HexColor("#d1d9e0")),
-            ("TOPPADDING",    (0, 0), (-1, -1), 10),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 10),
-            ("LEFTPADDING",   (0, 0), (0, 0),   0),
-            ("RIGHTPADDING",  (0, 0), (0, 0),   0),
-            ("LEFTPADDING",   (1, 0), (1, 0),   14),
-            ("RIGHTPADDING",  (1, 0), (1, 0),   12),
-            ("VALIGN",  (0, 0), (-1, -1), "TOP"),
-            ("ALIGN",   (0, 0), (0, 0),   "CENTER"),
-        ]))
-        story.append(g_row)
+        guidance_table.setStyle(_guidance_table_style(guidance_count))
+        story.append(guidance_table)
         story.append(Spacer(1, 5))
 
     # ── 08 COST SAVINGS OPPORTUNITIES ───────────────────────────────────────────
     if analysis.savings_opportunities:
         story.append(Spacer(1, 0.3 * inch))
-        story += section_header(sn(8), "Cost Savings Opportunities", styles)
+        story += section_header(sn[8], "Cost Savings Opportunities", styles)
         story.append(Paragraph(
             "The following opportunities are independent of PBM renegotiation — actions the employer "
             "and broker can take now, within the current plan year, without waiting for contract renewal.",
@@ -899,19 +1092,6 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
         ))
         story.append(Spacer(1, 0.1 * inch))
 
-        SAVINGS_COLORS = {
-            "Biosimilar Opportunity":  (colors.HexColor("#dcfce7"), colors.HexColor("#16a34a")),
-            "New Generic Available":   (colors.HexColor("#dbeafe"), colors.HexColor("#1d4ed8")),
-            "Alternative Pharmacy":    (colors.HexColor("#f3e8ff"), colors.HexColor("#7c3aed")),
-            "Coupon/Accumulator":      (colors.HexColor("#ffedd5"), colors.HexColor("#ea580c")),
-            "Formulary Optimization":  (colors.HexColor("#ccfbf1"), colors.HexColor("#0d9488")),
-        }
-        IMPACT_COLORS = {
-            "High":   colors.HexColor("#dc2626"),
-            "Medium": colors.HexColor("#d97706"),
-            "Low":    colors.HexColor("#1d4ed8"),
-        }
-
         for item in analysis.savings_opportunities:
             cat_bg, cat_fg = SAVINGS_COLORS.get(item.category, (LIGHT_BG, PRIMARY))
             impact_color = IMPACT_COLORS.get(item.estimated_impact, MUTED)
@@ -919,20 +1099,9 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
             savings_block = Table(
                 [
                     [
-                        Paragraph(item.category, ParagraphStyle(
-                            f"sc{item.category[:4]}", parent=styles["body_left"],
-                            textColor=cat_fg, fontName="Helvetica-Bold",
-                            fontSize=8.5, spaceAfter=0,
-                        )),
-                        Paragraph(item.drug_or_area, ParagraphStyle(
-                            f"sn{item.drug_or_area[:4]}", parent=styles["subsection_heading"],
-                            spaceBefore=0, spaceAfter=0, textColor=DARK_TEXT, fontSize=10.5,
-                        )),
-                        Paragraph(item.estimated_impact, ParagraphStyle(
-                            f"si{item.estimated_impact}", parent=styles["body_left"],
-                            textColor=WHITE, fontName="Helvetica-Bold",
-                            fontSize=8.5, spaceAfter=0, alignment=TA_CENTER,
-                        )),
+                        Paragraph(item.category, colored_style("category", cat_fg)),
+                        Paragraph(item.drug_or_area, styles["savings_heading"]),
+                        Paragraph(item.estimated_impact, styles["badge"]),
                     ],
                     [
                         Paragraph(item.opportunity, styles["table_cell"]),
@@ -941,11 +1110,8 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
                     ],
                     [
                         Paragraph(
-                            f"<b>Action Required:</b> {item.action_required}",
-                            ParagraphStyle(
-                                f"sa{item.category[:4]}", parent=styles["table_cell"],
-                                textColor=cat_fg,
-                            ),
+                            f"<b>Action Required:</b> {escape(item.action_required)}",
+                            colored_style("note", cat_fg),
                         ),
                         "",
                         "",
@@ -953,18 +1119,18 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
                 ],
                 colWidths=[1.8 * inch, CONTENT_W - 2.7 * inch, 0.9 * inch],
             )
-            savings_block.setStyle(TableStyle([
+            savings_block.setStyle(_table_style(
                 ("BACKGROUND", (0, 0), (0, 0), cat_bg),
                 ("BACKGROUND", (1, 0), (1, 0), LIGHT_BG),
                 ("BACKGROUND", (2, 0), (2, 0), impact_color),
                 ("SPAN",       (0, 1), (2, 1)),
                 ("SPAN",       (0, 2), (2, 2)),
                 ("BACKGROUND", (0, 1), (-1, 1), WHITE),
-                ("BACKGROUND", (0, 2), (-1, 2), colors.HexColor("#f8fafc")),
+                ("BACKGROUND", (0, 2), (-1, 2), ROW_ALT_BG),
                 ("LINEBEFORE", (0, 0), (0, -1), 5, cat_fg),
-                ("BOX",        (0, 0), (-1, -1), 0.5, colors.HexColor("#d1d9e0")),
-                ("LINEBELOW",  (0, 0), (-1, 0),  0.5, colors.HexColor("#d1d9e0")),
-                ("LINEBELOW",  (0, 1), (-1, 1),  0.5, colors.HexColor("#edf2f7")),
+                ("BOX",        (0, 0), (-1, -1), 0.5, BORDER),
+                ("LINEBELOW",  (0, 0), (-1, 0),  0.5, BORDER),
+                ("LINEBELOW",  (0, 1), (-1, 1),  0.5, BORDER_LIGHT),
                 ("TOPPADDING",    (0, 0), (-1, -1), 8),
                 ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
                 ("LEFTPADDING",   (0, 0), (0, 0),  12),
@@ -978,12 +1144,12 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
                 ("VALIGN",  (0, 0), (-1, -1), "MIDDLE"),
                 ("ALIGN",   (2, 0), (2, 0),   "CENTER"),
                 ("VALIGN",  (0, 1), (-1, -1), "TOP"),
-            ]))
+            ))
             story.append(KeepTogether([savings_block, Spacer(1, 9)]))
 
     # ── 09 DATA SOURCES & METHODOLOGY ────────────────────────────────────────────
     story.append(Spacer(1, 0.3 * inch))
-    story += section_header(snl(8), "Data Sources & Methodology", styles)
+    story += section_header(snl[8], "Data Sources & Methodology", styles)
     story.append(Paragraph(
         "Market benchmarks in this report are derived from five primary industry sources: "
         "<b>Pharmaceutical Strategies Group (PSG) Rx Drug Benefit Practices and Benchmarks "
@@ -1001,8 +1167,10 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
     ))
 
     # ── 10 GLOSSARY ───────────────────────────────────────────────────────────────
-    story.append(PageBreak())
-    story += section_header(snl(9), "Glossary of PBM Terms", styles)
+    # Only start a fresh page when the heading, intro and first term wouldn't fit
+    story.append(Spacer(1, 0.3 * inch))
+    story.append(CondPageBreak(3.5 * inch))
+    story += section_header(snl[9], "Glossary of PBM Terms", styles)
     story.append(Paragraph(
         "The following definitions are provided to help benefits professionals and employers "
         "understand key PBM terminology referenced in this report.",
@@ -1016,39 +1184,25 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
     except ImportError:
         glossary = []
 
-    glossary_style = ParagraphStyle(
-        "pbm_glossary_term", parent=styles["subsection_heading"],
-        fontSize=10.5, spaceBefore=10, spaceAfter=2, textColor=PRIMARY,
-    )
-    glossary_def_style = ParagraphStyle(
-        "pbm_glossary_def", parent=styles["body"],
-        fontSize=9.5, leading=14, spaceAfter=2,
-    )
-    glossary_example_style = ParagraphStyle(
-        "pbm_glossary_example", parent=styles["body"],
-        fontSize=9, fontName="Helvetica-Oblique", textColor=MUTED,
-        leading=13, spaceAfter=0,
-    )
-
     for entry in glossary:
-        term_para = Paragraph(entry["term"], glossary_style)
-        def_para = Paragraph(entry["definition"], glossary_def_style)
+        term_para = Paragraph(entry["term"], styles["glossary_term"])
+        def_para = Paragraph(entry["definition"], styles["glossary_def"])
         example_para = Paragraph(
             f"<i>Example: {entry['example']}</i>",
-            glossary_example_style,
+            styles["glossary_example"],
         )
         story.append(KeepTogether([
             term_para,
             def_para,
             example_para,
-            HRFlowable(width="100%", thickness=0.3, color=colors.HexColor("#e2e8f0"),
+            HRFlowable(width="100%", thickness=0.3, color=RULE,
                        spaceAfter=0, spaceBefore=6),
         ]))
 
     # ── Final disclaimer ─────────────────────────────────────────────────────
     story.append(Spacer(1, 0.4 * inch))
     story.append(HRFlowable(width="100%", thickness=0.5,
-                             color=colors.HexColor("#d1d9e0")))
+                             color=BORDER))
     story.append(Spacer(1, 0.1 * inch))
     story.append(Paragraph(
         f"PBM Contract Analysis Report  ·  Generated {analysis_date}  ·  Confidential\n"
@@ -1057,4 +1211,8 @@ def generate_pdf_report(analysis: PBMAnalysisReport, contact_info: ContactInfo,
         styles["footer_text"],
     ))
 
-    doc.build(story, onFirstPage=_on_first_page, onLaterPages=_on_later_pages)
+    if PDF_PROFILE_DIR:
+        _profiled_build(doc, story, output_path,
+                        onFirstPage=_on_first_page, onLaterPages=_on_later_pages)
+    else:
+        doc.build(story, onFirstPage=_on_first_page, onLaterPages=_on_later_pages)
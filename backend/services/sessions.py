@@ -0,0 +1,94 @@
+"""
+Analysis session store.
+Sessions live in SQLite next to leads and contracts rather than in process
+memory, so status polling works across Uvicorn workers and survives restarts.
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from .leads import DB_PATH, connect_db
+from .models import SessionData
+
+SESSION_TTL_SECONDS = 3600
+
+
+def init_sessions_table():
+    """Create the sessions table if it doesn't already exist."""
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                id       TEXT PRIMARY KEY,
+                data     TEXT NOT NULL,
+                updated  REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated)")
+        conn.commit()
+
+
+class SessionStore:
+    """SessionData rows keyed by session id, shared by every thread in the process."""
+
+    def __init__(self, ttl_seconds: int = SESSION_TTL_SECONDS):
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened on first use; callers must hold self._lock
+        if self._conn is None:
+            self._conn = connect_db()
+        return self._conn
+
+    def get(self, session_id: str) -> Optional[SessionData]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT data FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+        return SessionData.model_validate_json(row[0]) if row else None
+
+    def put(self, session_id: str, session: SessionData) -> None:
+        """Insert or replace a session, dropping any that have gone stale."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, data, updated) VALUES (?, ?, ?)",
+                (session_id, session.model_dump_json(), now),
+            )
+            self._purge(conn, now)
+
+    def purge_expired(self) -> int:
+        """Delete sessions idle for longer than the TTL; returns how many were removed."""
+        with self._lock:
+            return self._purge(self._connection(), time.time())
+
+    def _purge(self, conn: sqlite3.Connection, now: float) -> int:
+        return conn.execute("DELETE FROM sessions WHERE updated < ?", (now - self._ttl_seconds,)).rowcount
+
+    def update(self, session_id: str, **changes) -> None:
+        """Apply field changes to a stored session in a single write transaction."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT data FROM sessions WHERE id = ?", (session_id,)).fetchone()
+                if row:
+                    session = SessionData.model_validate_json(row[0])
+                    for field, value in changes.items():
+                        setattr(session, field, value)
+                    conn.execute(
+                        "UPDATE sessions SET data = ?, updated = ? WHERE id = ?",
+                        (session.model_dump_json(), time.time(), session_id),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]